@@ -0,0 +1,346 @@
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import (
+    Column, DateTime, Float, Integer, MetaData, String, Table, Text, UniqueConstraint,
+    create_engine, delete, event, insert, inspect, select, tuple_
+)
+from sqlalchemy.pool import StaticPool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+metadata = MetaData()
+
+analyses_table = Table(
+    'analyses', metadata,
+    Column('analysis_id', String(36), primary_key=True),
+    Column('created_at', DateTime, nullable=False, index=True),
+    Column('resume_file', String(255)),
+    Column('payload', Text, nullable=False)
+)
+
+# Compact rows so score queries never have to load or parse the JSON payloads
+analysis_scores_table = Table(
+    'analysis_scores', metadata,
+    Column('analysis_id', String(36), primary_key=True),
+    Column('created_at', DateTime, nullable=False, index=True),
+    Column('resume_file', String(255)),
+    Column('overall_score', Float, index=True),
+    Column('semantic_similarity', Float),
+    Column('skill_match', Float),
+    Column('experience_match', Float),
+    Column('education_match', Float),
+    Column('keyword_match', Float)
+)
+
+# Resume skill bitmasks (hex) for AND/popcount prefiltering; only comparable within one taxonomy.
+# One row per resume content, the latest analysis wins; id only grows, so readers can fetch
+# just the rows written since they last looked
+resume_skills_table = Table(
+    'resume_skill_masks', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('taxonomy', String(16), nullable=False),
+    Column('resume_hash', String(64), nullable=False),
+    Column('analysis_id', String(36), nullable=False),
+    Column('created_at', DateTime, nullable=False),
+    Column('resume_file', String(255)),
+    Column('skill_mask', String(64), nullable=False),
+    UniqueConstraint('taxonomy', 'resume_hash'),
+    sqlite_autoincrement=True
+)
+
+SCORE_COMPONENTS = ('semantic_similarity', 'skill_match', 'experience_match', 'education_match', 'keyword_match')
+
+
+def create_database_engine(database_url: str):
+    if database_url.startswith('sqlite') and ':memory:' in database_url:
+        # One shared connection, otherwise every connection sees its own empty in-memory database
+        return create_engine(
+            database_url,
+            connect_args={'check_same_thread': False},
+            poolclass=StaticPool
+        )
+
+    engine = create_engine(database_url, connect_args={'check_same_thread': False}
+                           if database_url.startswith('sqlite') else {})
+
+    if database_url.startswith('sqlite'):
+        @event.listens_for(engine, 'connect')
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            # WAL lets readers in other workers proceed while the writer thread commits
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA busy_timeout=5000')
+            cursor.close()
+
+    return engine
+
+
+class AnalysisDatabase:
+    """Persists analysis results through a background writer that commits in batches"""
+
+    def __init__(self, database_url: str, batch_size: int = 50, flush_interval: float = 0.5):
+        self.database_url = database_url
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.engine = create_database_engine(database_url)
+        metadata.create_all(self.engine)
+        self._copy_legacy_skill_masks()
+
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name='analysis-db-writer', daemon=True)
+        self._writer.start()
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    def save(self, analysis_result: Dict[str, Any]):
+        """Queue a result for persistence; never blocks the caller on I/O"""
+        self._queue.put(analysis_result)
+
+    def _build_rows(self, analysis_result: Dict[str, Any]):
+        created_at = datetime.fromisoformat(analysis_result['timestamp'])
+        similarity = analysis_result.get('similarity_analysis', {})
+        component_scores = similarity.get('component_scores', {})
+
+        analysis_row = {
+            'analysis_id': analysis_result['analysis_id'],
+            'created_at': created_at,
+            'resume_file': analysis_result.get('resume_file'),
+            'payload': json.dumps(analysis_result, default=str)
+        }
+        score_row = {
+            'analysis_id': analysis_result['analysis_id'],
+            'created_at': created_at,
+            'resume_file': analysis_result.get('resume_file'),
+            'overall_score': similarity.get('overall_score')
+        }
+        for component in SCORE_COMPONENTS:
+            score_row[component] = component_scores.get(component)
+
+        skill_mask = analysis_result.get('resume_analysis', {}).get('skill_mask')
+        skills_row = {
+            'taxonomy': skill_mask['taxonomy'],
+            # Results cached before resume hashes were recorded count as distinct resumes
+            'resume_hash': skill_mask.get('resume_hash') or analysis_result['analysis_id'],
+            'analysis_id': analysis_result['analysis_id'],
+            'created_at': created_at,
+            'resume_file': analysis_result.get('resume_file'),
+            'skill_mask': skill_mask['mask']
+        } if skill_mask else None
+        return analysis_row, score_row, skills_row
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        analysis_rows = []
+        score_rows = []
+        skills_rows = []
+        for analysis_result in batch:
+            try:
+                analysis_row, score_row, skills_row = self._build_rows(analysis_result)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Skipping unpersistable analysis: {str(e)}")
+                self.failed += 1
+                continue
+            analysis_rows.append(analysis_row)
+            score_rows.append(score_row)
+            if skills_row is not None:
+                skills_rows.append(skills_row)
+        # The same resume analyzed twice in one batch keeps only its latest row
+        skills_rows = list({(row['taxonomy'], row['resume_hash']): row for row in skills_rows}.values())
+
+        if not analysis_rows:
+            return
+
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(
+                    insert(analyses_table).prefix_with('OR REPLACE', dialect='sqlite'), analysis_rows
+                )
+                connection.execute(
+                    insert(analysis_scores_table).prefix_with('OR REPLACE', dialect='sqlite'), score_rows
+                )
+                if skills_rows:
+                    # Delete and reinsert rather than update, so a re-analyzed resume gets a new id
+                    connection.execute(delete(resume_skills_table).where(
+                        tuple_(resume_skills_table.c.taxonomy, resume_skills_table.c.resume_hash).in_(
+                            [(row['taxonomy'], row['resume_hash']) for row in skills_rows]
+                        )
+                    ))
+                    connection.execute(insert(resume_skills_table), skills_rows)
+            self.written += len(analysis_rows)
+            self.batches += 1
+        except Exception as e:
+            logger.error(f"Failed to persist {len(analysis_rows)} analyses: {str(e)}")
+            self.failed += len(analysis_rows)
+
+    def _write_loop(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            # Collect whatever else arrives within the flush window, up to batch_size
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write_batch(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued result has been written"""
+        self._queue.join()
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self.engine.connect() as connection:
+            payload = connection.execute(
+                select(analyses_table.c.payload).where(analyses_table.c.analysis_id == analysis_id)
+            ).scalar_one_or_none()
+        return json.loads(payload) if payload is not None else None
+
+    def list_scores(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    min_score: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query = select(analysis_scores_table).order_by(analysis_scores_table.c.created_at.desc())
+        if since is not None:
+            query = query.where(analysis_scores_table.c.created_at >= since)
+        if until is not None:
+            query = query.where(analysis_scores_table.c.created_at < until)
+        if min_score is not None:
+            query = query.where(analysis_scores_table.c.overall_score >= min_score)
+        query = query.limit(limit)
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(query).mappings().all()
+        return [
+            {**row, 'created_at': row['created_at'].isoformat()}
+            for row in rows
+        ]
+
+    def _copy_legacy_skill_masks(self):
+        """Carry masks over from the per-analysis resume_skills table, once; those rows have no resume hash"""
+        if not inspect(self.engine).has_table('resume_skills'):
+            return
+        with self.engine.begin() as connection:
+            if connection.execute(select(resume_skills_table.c.id).limit(1)).first() is not None:
+                return
+            legacy = Table('resume_skills', MetaData(), autoload_with=connection)
+            copied = connection.execute(insert(resume_skills_table).from_select(
+                ['taxonomy', 'resume_hash', 'analysis_id', 'created_at', 'resume_file', 'skill_mask'],
+                select(legacy.c.taxonomy, legacy.c.analysis_id, legacy.c.analysis_id, legacy.c.created_at,
+                       legacy.c.resume_file, legacy.c.skill_mask).order_by(legacy.c.created_at)
+            )).rowcount
+        logger.info(f"Copied {copied} resume skill masks from the resume_skills table")
+
+    def skill_masks(self, taxonomy: str, after_id: int = 0) -> List[Any]:
+        """Stored resume rows for this taxonomy written after after_id, oldest first"""
+        query = select(
+            resume_skills_table.c.id,
+            resume_skills_table.c.resume_hash,
+            resume_skills_table.c.analysis_id,
+            resume_skills_table.c.created_at,
+            resume_skills_table.c.resume_file,
+            resume_skills_table.c.skill_mask
+        ).where(
+            resume_skills_table.c.taxonomy == taxonomy,
+            resume_skills_table.c.id > after_id
+        ).order_by(resume_skills_table.c.id)
+
+        with self.engine.connect() as connection:
+            return connection.execute(query).all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending_writes': self._queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'failed': self.failed
+        }
+
+    def close(self):
+        self._stop.set()
+        self._writer.join(timeout=max(5.0, self.flush_interval * 4))
+        self.engine.dispose()
+
+
+class SkillMaskIndex:
+    """Packed skill masks of stored resumes, kept in memory for prefiltering.
+
+    Loads the table once per taxonomy and afterwards reads only rows written since the
+    last refresh, so a request neither reloads nor re-parses every stored mask. Rows
+    are per resume content; a re-analyzed resume replaces its earlier entry.
+    """
+
+    def __init__(self, database: AnalysisDatabase, skill_taxonomy):
+        self.database = database
+        self.skill_taxonomy = skill_taxonomy
+        self._lock = threading.Lock()
+        self._taxonomy = None
+        self._last_id = 0
+        self._positions = {}
+        self._rows = []
+        self._masks = []
+        self._packed = skill_taxonomy.pack_masks([])
+
+    def snapshot(self, taxonomy: str) -> Tuple[List[Dict[str, Any]], List[int], np.ndarray]:
+        """(rows, masks, packed) for every stored resume whose mask was built with this taxonomy.
+
+        The returned objects are never modified afterwards, so callers may use them without the lock.
+        """
+        with self._lock:
+            if taxonomy != self._taxonomy:
+                self._taxonomy = taxonomy
+                self._last_id = 0
+                self._positions = {}
+                self._rows, self._masks = [], []
+                self._packed = self.skill_taxonomy.pack_masks([])
+
+            new_rows = self.database.skill_masks(taxonomy, self._last_id)
+            if new_rows:
+                self._apply(new_rows)
+            return self._rows, self._masks, self._packed
+
+    def _apply(self, new_rows: List[Any]):
+        rows, masks = list(self._rows), list(self._masks)
+        replaced, appended = {}, []
+        for row in new_rows:
+            entry = {'analysis_id': row.analysis_id, 'created_at': row.created_at.isoformat(),
+                     'resume_file': row.resume_file}
+            mask = int(row.skill_mask, 16)
+            position = self._positions.get(row.resume_hash)
+            if position is None:
+                position = self._positions[row.resume_hash] = len(rows)
+                rows.append(entry)
+                masks.append(mask)
+                appended.append(mask)
+            else:
+                rows[position] = entry
+                masks[position] = mask
+                if position < len(self._rows):
+                    replaced[position] = mask
+                else:
+                    appended[position - len(self._rows)] = mask
+
+        packed = np.vstack([self._packed, self.skill_taxonomy.pack_masks(appended)])
+        if replaced:
+            positions = list(replaced)
+            packed[positions] = self.skill_taxonomy.pack_masks([replaced[position] for position in positions])
+        self._rows, self._masks, self._packed = rows, masks, packed
+        self._last_id = new_rows[-1].id
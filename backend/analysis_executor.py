@@ -0,0 +1,185 @@
+import asyncio
+import functools
+import itertools
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from analysis_pipeline import AnalysisPipeline
+from process_pool import SPAWN_CONTEXT, LazyProcessPool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Each pool worker builds its own pipeline once and keeps it for its lifetime,
+# so spaCy and the extractor patterns are loaded per process, not per request.
+_worker_pipeline = None
+_worker_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _worker_pipeline, _worker_progress_queue
+    _worker_pipeline = AnalysisPipeline()
+    _worker_progress_queue = progress_queue
+    logger.info(f"Analysis worker {os.getpid()} ready")
+
+
+def _report_progress(call_id: int, stage: str):
+    _worker_progress_queue.put((call_id, stage))
+
+
+def _call_pipeline(method: str, args: tuple, kwargs: dict,
+                   progress_call_id: Optional[int] = None) -> Tuple[Any, int, Dict[str, Any]]:
+    if progress_call_id is not None:
+        kwargs = {**kwargs, 'progress': functools.partial(_report_progress, progress_call_id)}
+    result = getattr(_worker_pipeline, method)(*args, **kwargs)
+    # Caches live inside each worker, so their counters ride back with every result
+    return result, os.getpid(), _worker_pipeline.cache_stats()
+
+
+class AnalysisExecutor:
+    """Runs AnalysisPipeline calls on a pool of threads sharing one pipeline (inline) or of worker processes.
+
+    max_workers sizes either pool, so at most that many calls run at once and the rest queue.
+    """
+
+    EXECUTION_MODES = ('inline', 'process')
+
+    def __init__(self, mode: str = 'inline', max_workers: Optional[int] = None,
+                 pipeline: Optional[AnalysisPipeline] = None):
+        if mode not in self.EXECUTION_MODES:
+            raise ValueError(f"Unsupported execution mode: {mode}. Use one of: {', '.join(self.EXECUTION_MODES)}")
+
+        self.mode = mode
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.pipeline = pipeline
+        self._pool = None
+        self._threads = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._worker_cache_stats = {}
+        self._progress_queue = None
+        self._progress_reader = None
+        self._progress_callbacks = {}
+        self._call_ids = itertools.count()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._progress_queue = SPAWN_CONTEXT.Queue()
+            self._pool = LazyProcessPool('analysis', self.max_workers, _init_worker, (self._progress_queue,))
+        return self._pool.get()
+
+    def _read_progress(self):
+        # Workers report (call_id, stage) on one shared queue; hand each report to its caller's loop
+        while True:
+            try:
+                message = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            call_id, stage = message
+            registration = self._progress_callbacks.get(call_id)
+            if registration is not None:
+                loop, callback = registration
+                loop.call_soon_threadsafe(callback, stage)
+
+    def _register_progress(self, callback: Callable[[str], None]) -> int:
+        if self._progress_reader is None:
+            self._progress_reader = threading.Thread(
+                target=self._read_progress, name='analysis-progress-reader', daemon=True
+            )
+            self._progress_reader.start()
+        call_id = next(self._call_ids)
+        self._progress_callbacks[call_id] = (asyncio.get_running_loop(), callback)
+        return call_id
+
+    def _get_pipeline(self) -> AnalysisPipeline:
+        if self.pipeline is None:
+            self.pipeline = AnalysisPipeline()
+        return self.pipeline
+
+    async def call(self, method: str, *args, progress: Optional[Callable[[str], None]] = None, **kwargs) -> Any:
+        self._in_flight += 1
+        progress_call_id = None
+        try:
+            if self.mode == 'process':
+                loop = asyncio.get_running_loop()
+                pool = self._get_pool()
+                if progress is not None:
+                    progress_call_id = self._register_progress(progress)
+                try:
+                    result, worker_pid, cache_stats = await loop.run_in_executor(
+                        pool, _call_pipeline, method, args, kwargs, progress_call_id
+                    )
+                    self._worker_cache_stats[worker_pid] = cache_stats
+                except BrokenProcessPool:
+                    self._pool.discard(pool)
+                    self._worker_cache_stats = {}
+                    raise
+            else:
+                # Off the event loop, so other requests are served while this one extracts and scores;
+                # progress is handed back to the caller's loop, as it is from the process pool
+                if progress is not None:
+                    loop = asyncio.get_running_loop()
+                    kwargs['progress'] = lambda stage: loop.call_soon_threadsafe(progress, stage)
+                if self._threads is None:
+                    self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis')
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._threads, functools.partial(getattr(self._get_pipeline(), method), *args, **kwargs)
+                )
+            self._completed += 1
+            return result
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            if progress_call_id is not None:
+                self._progress_callbacks.pop(progress_call_id, None)
+
+    async def analyze(self, filename: str, file_content: bytes, job_description: str,
+                      progress: Optional[Callable[[str], None]] = None, explain: bool = True) -> Dict[str, Any]:
+        return await self.call('run', filename, file_content, job_description, progress=progress, explain=explain)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'workers': self.max_workers,
+            'in_flight': self._in_flight,
+            'queue_depth': max(0, self._in_flight - self.max_workers),
+            'completed': self._completed,
+            'failed': self._failed
+        }
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        if self.mode != 'process':
+            return self._get_pipeline().cache_stats()
+
+        # Sum the last reported counters of every worker; ratios are recomputed from the totals
+        totals = {}
+        for worker_stats in self._worker_cache_stats.values():
+            for cache_name, stats in worker_stats.items():
+                cache_totals = totals.setdefault(cache_name, {})
+                for key, value in stats.items():
+                    if isinstance(value, (int, float)) and key not in ('hit_rate', 'ttl', 'max_entries'):
+                        cache_totals[key] = cache_totals.get(key, 0) + value
+        for cache_totals in totals.values():
+            lookups = cache_totals.get('hits', 0) + cache_totals.get('misses', 0)
+            cache_totals['hit_rate'] = round(cache_totals.get('hits', 0) / lookups, 4) if lookups else 0.0
+            cache_totals['workers_reporting'] = len(self._worker_cache_stats)
+        return totals
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import re
+from typing import Callable, Dict, Any, List, Mapping, Optional, Tuple
+
+from cache import DiskCache, LRUCache, TieredCache, content_hash
+from config import config
+from corpus_model import load_tfidf_model
+from text_extractor import TextExtractor
+from text_preprocessor import TextPreprocessor
+from similarity_engine import JobProfile, SimilarityEngine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+PIPELINE_STAGES = ('extracting', 'preprocessing', 'scoring')
+
+
+class ExtractionError(Exception):
+    """Raised when no text could be extracted from an uploaded resume"""
+
+
+def create_similarity_engine() -> SimilarityEngine:
+    """SimilarityEngine configured from config, loading the corpus TF-IDF model if there is one"""
+    return SimilarityEngine(
+        model_name=config.SEMANTIC_MODE,
+        tfidf_vectorizer=load_tfidf_model(config.TFIDF_MODEL_PATH) if config.SEMANTIC_MODE == 'tfidf' else None,
+        dtype=config.TFIDF_DTYPE,
+        hashing_features=config.HASHING_FEATURES,
+        keyword_idf=config.KEYWORD_IDF_WEIGHTING
+    )
+
+
+class AnalysisPipeline:
+    """Extraction, preprocessing and scoring for one resume/job description pair.
+
+    The extractor signature and the preprocessor and engine VERSIONs are part of the
+    cache keys here; bump a VERSION whenever its component's output changes.
+    """
+
+    def __init__(self, extractor: Optional[TextExtractor] = None,
+                 preprocessor: Optional[TextPreprocessor] = None,
+                 similarity_engine: Optional[SimilarityEngine] = None,
+                 preprocessing_options: Optional[Dict[str, bool]] = None):
+        self.extractor = extractor or TextExtractor()
+        self.preprocessor = preprocessor or TextPreprocessor()
+        self.similarity_engine = similarity_engine or create_similarity_engine()
+        self.preprocessing_options = preprocessing_options
+        self.job_cache = LRUCache(max_entries=config.JOB_CACHE_SIZE, ttl=config.CACHE_TTL)
+        self.score_cache = LRUCache(max_entries=config.SCORE_CACHE_SIZE, ttl=config.CACHE_TTL)
+        self.extraction_cache = TieredCache(
+            LRUCache(max_entries=config.EXTRACTION_CACHE_SIZE),
+            DiskCache(
+                os.path.join(config.RESULTS_DIR, 'extraction_cache'),
+                max_entries=config.EXTRACTION_DISK_CACHE_MAX_ENTRIES
+            ) if config.EXTRACTION_DISK_CACHE else None
+        )
+
+    @staticmethod
+    def _normalize_job_description(job_description: str) -> str:
+        text = job_description.replace('\r\n', '\n').replace('\r', '\n')
+        text = re.sub(r'[ \t]+', ' ', text)
+        return text.strip()
+
+    def _job_entry(self, job_description: str) -> Tuple[Dict[str, Any], Dict[str, Any], JobProfile]:
+        normalized = self._normalize_job_description(job_description)
+        cache_key = content_hash(
+            self.preprocessor.VERSION,
+            json.dumps(self.preprocessing_options or {}, sort_keys=True),
+            self.similarity_engine.signature,
+            normalized
+        )
+
+        cached = self.job_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        job_processed = self.preprocessor.preprocess_text(normalized, self.preprocessing_options)
+        job_features = self.preprocessor.get_feature_vector(job_processed)
+        cached = (job_processed, job_features, self.similarity_engine.build_job_profile(job_features))
+        self.job_cache.set(cache_key, cached)
+        return cached
+
+    def process_job_description(self, job_description: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return (processed, features) for a job description, served from the cache when seen before.
+
+        Cached values are shared between callers and must not be mutated.
+        """
+        return self._job_entry(job_description)[:2]
+
+    def job_profile(self, job_description: str) -> JobProfile:
+        """The cached JobProfile every candidate for this job description is scored against"""
+        return self._job_entry(job_description)[2]
+
+    def extract_resume(self, filename: str, file_content: bytes) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Return (extraction_result, cache_tier); identical uploads skip parsing and OCR entirely.
+
+        The file extension is part of the key because it decides which extractor runs, and
+        the extractor signature because OCR settings change the text.
+        """
+        cache_key = content_hash(
+            self.extractor.signature,
+            os.path.splitext(filename or '')[1].lower(),
+            file_content or b''
+        )
+
+        cached, tier = self.extraction_cache.get(cache_key)
+        if cached is not None:
+            return cached, tier
+
+        extraction_result = self.extractor.extract_text(filename, file_content)
+        if extraction_result.get('success'):
+            self.extraction_cache.set(cache_key, extraction_result)
+        return extraction_result, None
+
+    @staticmethod
+    def _require_text(extraction_result: Dict[str, Any]) -> str:
+        if not extraction_result['success']:
+            raise ExtractionError(
+                f"Failed to extract text from resume: {extraction_result.get('error', 'Unknown error')}"
+            )
+        return extraction_result['text']
+
+    def prepare_resume(self, filename: str, file_content: bytes) -> Dict[str, Any]:
+        """Extract and preprocess one resume and return its feature vector, ready for rank()"""
+        extraction_result, _ = self.extract_resume(filename, file_content)
+        resume_text = self._require_text(extraction_result)
+        resume_processed = self.preprocessor.preprocess_text(resume_text, self.preprocessing_options)
+        return self.preprocessor.get_feature_vector(resume_processed)
+
+    def rank(self, resume_features: List[Dict[str, Any]], job_description: str, top_k: int = 10,
+             cascade: bool = False, explain: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """(ranked, counts); with cascade, candidates that cannot reach the top_k skip semantic scoring.
+
+        explain adds analysis and recommendations to the returned top_k entries only.
+        """
+        job_profile = self.job_profile(job_description)
+        if cascade:
+            ranked, counts = self.similarity_engine.cascade_rank(resume_features, job_profile, top_k)
+        else:
+            ranked = self.similarity_engine.rank(resume_features, job_profile, top_k)
+            counts = {'candidates': len(resume_features), 'semantic_scored': len(resume_features), 'pruned': 0}
+        if explain:
+            ranked = [self.similarity_engine.explain(entry) for entry in ranked]
+        return ranked, counts
+
+    def job_skill_mask(self, job_description: str) -> Tuple[str, int]:
+        """(taxonomy fingerprint, skill mask) of a job description, for filtering stored resumes"""
+        return self.similarity_engine.skill_taxonomy.fingerprint, self.job_profile(job_description).skill_mask
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            'job_description': self.job_cache.stats(),
+            'extraction': self.extraction_cache.stats(),
+            'score': self.score_cache.stats(),
+            'ocr_page': self.extractor.ocr_cache.stats()
+        }
+
+    def _score_cache_key(self, filename: str, file_content: bytes, job_description: str,
+                         weights: Mapping[str, float]) -> str:
+        """Key for one resume/job description pair under the current engine, weights and processing versions.
+
+        The engine signature covers the semantic model and skill taxonomy, so changing
+        either, or the weights, makes old entries unreachable.
+        """
+        return content_hash(
+            self.similarity_engine.VERSION,
+            self.similarity_engine.signature,
+            json.dumps(dict(weights), sort_keys=True),
+            self.extractor.signature,
+            self.preprocessor.VERSION,
+            json.dumps(self.preprocessing_options or {}, sort_keys=True),
+            os.path.splitext(filename or '')[1].lower(),
+            content_hash(file_content or b''),
+            self._normalize_job_description(job_description)
+        )
+
+    def run(self, filename: str, file_content: bytes, job_description: str,
+            progress: Optional[Callable[[str], None]] = None, explain: bool = True) -> Dict[str, Any]:
+        """Analyze one resume; progress, if given, is called with each stage name as it starts.
+
+        Results are cached per resume/job description pair, so repeating a request returns
+        the earlier analysis without extracting, preprocessing or scoring again. Only the
+        compact score record is cached; with explain, the analysis and recommendations are
+        generated from it on the way out, so explained and score-only requests share entries.
+        """
+        report_stage = progress or (lambda stage: None)
+
+        weights = self.similarity_engine.weights
+        score_key = self._score_cache_key(filename, file_content, job_description, weights)
+        cached = self.score_cache.get(score_key)
+        if cached is not None:
+            logger.info("Returning cached analysis for this resume and job description")
+            return self._with_explanation({
+                **cached,
+                'resume_file': filename,
+                'extraction_info': {**cached['extraction_info'], 'cache': 'score'}
+            }, explain)
+
+        logger.info("Extracting text from resume...")
+        report_stage('extracting')
+        extraction_result, cache_tier = self.extract_resume(filename, file_content)
+        resume_text = self._require_text(extraction_result)
+
+        logger.info("Preprocessing texts...")
+        report_stage('preprocessing')
+        resume_processed = self.preprocessor.preprocess_text(resume_text, self.preprocessing_options)
+        job_processed, job_features, job_profile = self._job_entry(job_description)
+
+        logger.info("Extracting features...")
+        resume_features = self.preprocessor.get_feature_vector(resume_processed)
+
+        logger.info("Calculating similarity...")
+        report_stage('scoring')
+        resume = self.similarity_engine.prepare(resume_features)
+        similarity_result = self.similarity_engine.calculate_similarity(
+            resume,
+            job_profile,
+            explain=False
+        )
+
+        result = {
+            'resume_file': filename,
+            'extraction_info': {
+                'file_type': extraction_result['file_type'],
+                'extraction_method': extraction_result['extraction_method'],
+                'metadata': extraction_result.get('metadata', {}),
+                'cache': cache_tier or 'miss'
+            },
+            'resume_analysis': {
+                'statistics': resume_processed.get('statistics', {}),
+                'entities': resume_processed.get('entities', {}),
+                'skills': resume_processed.get('skills', {}),
+                'sections': resume_processed.get('sections', {}),
+                'features': resume_features,
+                'skill_mask': {
+                    'taxonomy': self.similarity_engine.skill_taxonomy.fingerprint,
+                    'mask': format(resume.skill_mask, 'x'),
+                    'resume_hash': content_hash(file_content or b'')
+                }
+            },
+            'job_analysis': {
+                'statistics': job_processed.get('statistics', {}),
+                'entities': job_processed.get('entities', {}),
+                'skills': job_processed.get('skills', {}),
+                'sections': job_processed.get('sections', {}),
+                'features': job_features
+            },
+            'similarity_analysis': similarity_result,
+            'quality_scores': {
+                'resume_quality': self.preprocessor._calculate_text_quality_score(
+                    resume_text, resume_processed
+                ),
+                'job_quality': self.preprocessor._calculate_text_quality_score(
+                    job_description, job_processed
+                )
+            }
+        }
+        # Weights replaced mid-analysis may have been used for scoring; don't file that under the old key
+        if self.similarity_engine.weights is weights:
+            self.score_cache.set(score_key, result)
+        return self._with_explanation(result, explain)
+
+    def _with_explanation(self, result: Dict[str, Any], explain: bool) -> Dict[str, Any]:
+        if not explain:
+            return result
+        return {**result, 'similarity_analysis': self.similarity_engine.explain(result['similarity_analysis'])}
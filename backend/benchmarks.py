@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the scoring and extraction hot paths.
+
+Usage:
+    python benchmarks.py                 # run every benchmark
+    python benchmarks.py sparse_semantic # run selected benchmarks
+"""
+
+import argparse
+import difflib
+import io
+import random
+import re
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from scipy import stats
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from similarity_engine import KEYWORD_PATTERN, SimilarityEngine, create_tfidf_vectorizer
+from skill_taxonomy import SkillTaxonomy
+
+
+WORD_POOL_SIZE = 20000
+
+
+def _synthetic_documents(count: int, words_per_document: int = 400, seed: int = 7) -> List[str]:
+    """Resume-sized documents over a large vocabulary with a Zipf-like word distribution"""
+    rng = random.Random(seed)
+    vocabulary = [f"term{index}" for index in range(WORD_POOL_SIZE)]
+    weights = [1.0 / (rank + 1) for rank in range(WORD_POOL_SIZE)]
+    return [' '.join(rng.choices(vocabulary, weights=weights, k=words_per_document)) for _ in range(count)]
+
+
+def _measure(function: Callable[[], object], repeats: int) -> Tuple[float, float]:
+    """Return (mean milliseconds per call, peak traced KiB of a single call)"""
+    function()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    elapsed = time.perf_counter() - started
+    return elapsed / repeats * 1000, peak / 1024
+
+
+def _print_table(title: str, rows: List[Tuple[str, float, float]]):
+    print(f"\n{title}")
+    print("-" * 60)
+    print(f"{'variant':<34}{'ms/call':>12}{'peak KiB':>14}")
+    for name, milliseconds, peak_kib in rows:
+        print(f"{name:<34}{milliseconds:>12.3f}{peak_kib:>14.1f}")
+
+
+def benchmark_sparse_semantic(repeats: int = 50):
+    """Dense toarray() + cosine_similarity (the previous path) against sparse CSR dot products"""
+    resume_text, job_text = _synthetic_documents(2)
+
+    def dense_pair():
+        vectorizer = create_tfidf_vectorizer()
+        embeddings = vectorizer.fit_transform([resume_text, job_text]).toarray()
+        return cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+
+    rows = [('per-request dense float64', *_measure(dense_pair, repeats))]
+    for dtype in ('float64', 'float32'):
+        engine = SimilarityEngine(dtype=dtype, strict=True)
+        rows.append((
+            f'per-request sparse {dtype}',
+            *_measure(lambda: engine._calculate_semantic_similarity({'text': resume_text}, {'text': job_text}), repeats)
+        ))
+    _print_table("Semantic similarity, TF-IDF fitted per request (max 5000 features)", rows)
+
+    # A corpus-fitted model has a much larger vocabulary, which is where densifying hurts most
+    corpus = _synthetic_documents(500, seed=11)
+    rows = []
+    for dtype in ('float64', 'float32'):
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2), dtype=getattr(np, dtype)).fit(corpus)
+
+        def dense_corpus_pair():
+            embeddings = vectorizer.transform([resume_text, job_text]).toarray()
+            return cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+
+        engine = SimilarityEngine(tfidf_vectorizer=vectorizer, dtype=dtype, strict=True)
+        rows.append((f'corpus dense {dtype}', *_measure(dense_corpus_pair, repeats)))
+        rows.append((
+            f'corpus sparse {dtype}',
+            *_measure(lambda: engine._calculate_semantic_similarity({'text': resume_text}, {'text': job_text}), repeats)
+        ))
+    _print_table(f"Semantic similarity, corpus-fitted TF-IDF ({len(vectorizer.vocabulary_)} features)", rows)
+
+
+def _overlapping_pairs(count: int, seed: int = 3) -> List[Tuple[str, str]]:
+    """(resume, job) pairs whose resume reuses a random share of the job's words, so similarity varies"""
+    rng = random.Random(seed)
+    jobs = _synthetic_documents(count, words_per_document=200, seed=seed)
+    fillers = _synthetic_documents(count, words_per_document=400, seed=seed + 1)
+    pairs = []
+    for job_text, filler_text in zip(jobs, fillers):
+        overlap = rng.random()
+        job_words = job_text.split()
+        resume_words = rng.sample(job_words, int(len(job_words) * overlap)) + filler_text.split()
+        rng.shuffle(resume_words)
+        pairs.append((' '.join(resume_words), job_text))
+    return pairs
+
+
+def benchmark_hashing_semantic(pair_count: int = 300, pool_size: int = 500):
+    """Throughput of feature hashing against per-request TF-IDF, and how closely their scores agree"""
+    pairs = _overlapping_pairs(pair_count)
+    engines = {
+        'tfidf': SimilarityEngine(model_name='tfidf', strict=True),
+        'hashing': SimilarityEngine(model_name='hashing', strict=True)
+    }
+
+    scores = {}
+    print(f"\nSemantic similarity throughput over {pair_count} pairs")
+    print("-" * 60)
+    for name, engine in engines.items():
+        started = time.perf_counter()
+        scores[name] = np.array([
+            engine._calculate_semantic_similarity({'text': resume_text}, {'text': job_text})
+            for resume_text, job_text in pairs
+        ])
+        elapsed = time.perf_counter() - started
+        print(f"{name:<10}{pair_count / elapsed:>10.0f} pairs/s")
+
+    resume_texts = [resume_text for resume_text, _ in _overlapping_pairs(pool_size, seed=5)]
+    job_text = pairs[0][1]
+    for name, engine in engines.items():
+        started = time.perf_counter()
+        engine._rank_semantic_similarity(resume_texts, engine.prepare({'text': job_text}))
+        print(f"{name:<10}{(time.perf_counter() - started) * 1000:>10.1f} ms to score a pool of {pool_size}")
+
+    pearson = stats.pearsonr(scores['tfidf'], scores['hashing'])[0]
+    spearman = stats.spearmanr(scores['tfidf'], scores['hashing'])[0]
+    print(f"\nScore agreement (tfidf vs hashing)")
+    print("-" * 60)
+    print(f"pearson {pearson:.4f}  spearman {spearman:.4f}  "
+          f"mean |diff| {np.mean(np.abs(scores['tfidf'] - scores['hashing'])):.4f}")
+
+
+def stress_thread_safety(threads: int = 16, rounds: int = 20, pair_count: int = 40):
+    """Hammer one engine per semantic mode from many threads and compare with sequential results.
+
+    Exits non-zero on any mismatch, so it can gate a deployment that scores in a thread pool.
+    """
+    pairs = _overlapping_pairs(pair_count, seed=17)
+    corpus_vectorizer = create_tfidf_vectorizer().fit(_synthetic_documents(200, seed=19))
+    engines = {
+        'tfidf per-request': SimilarityEngine(model_name='tfidf', strict=True),
+        'tfidf corpus-fitted': SimilarityEngine(model_name='tfidf', tfidf_vectorizer=corpus_vectorizer, strict=True),
+        'hashing': SimilarityEngine(model_name='hashing', strict=True),
+    }
+    job = {'text': pairs[0][1]}
+    resumes = [{'text': resume_text} for resume_text, _ in pairs]
+
+    print(f"\nThread-safety stress: {threads} threads x {rounds} rounds x {pair_count} pairs")
+    print("-" * 60)
+    failures = 0
+    for name, engine in engines.items():
+        def score(pair):
+            return engine.calculate_similarity({'text': pair[0]}, {'text': pair[1]})
+
+        expected = [score(pair) for pair in pairs]
+        expected_ranking = engine.rank(resumes, job, top_k=10)
+
+        tasks = [(index, pair) for index, pair in enumerate(pairs)] * rounds
+        random.Random(23).shuffle(tasks)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(lambda task: (task[0], score(task[1])), tasks))
+            rankings = list(executor.map(lambda _: engine.rank(resumes, job, top_k=10), range(threads * 2)))
+
+        mismatches = sum(1 for index, result in results if result != expected[index])
+        mismatches += sum(1 for ranking in rankings if ranking != expected_ranking)
+        failures += mismatches
+        print(f"{name:<22}{len(results) + len(rankings):>8} calls {mismatches:>6} mismatches")
+
+    if failures:
+        print(f"\nFAILED: {failures} concurrent results differed from sequential runs")
+        sys.exit(1)
+    print("\nAll concurrent results match the sequential runs")
+
+
+def _legacy_keyword_match(resume_text: str, job_text: str) -> float:
+    """Keyword coverage as computed before token sets: a substring search per JD word"""
+    resume_text, job_text = resume_text.lower(), job_text.lower()
+    important_keywords = [word for word in re.findall(r'\b[a-zA-Z]{3,}\b', job_text) if len(word) > 3]
+    if not important_keywords:
+        return 0.0
+    return sum(1 for keyword in important_keywords if keyword in resume_text) / len(important_keywords)
+
+
+def _letter_words(count: int, words_per_document: int, seed: int) -> List[str]:
+    """Like _synthetic_documents, but the words are letters only, as keyword matching requires"""
+    def letters(index: int) -> str:
+        word = ''
+        while True:
+            index, remainder = divmod(index, 26)
+            word += chr(ord('a') + remainder)
+            if not index:
+                return 'kw' + word
+    return [
+        ' '.join(letters(int(word[4:])) for word in document.split())
+        for document in _synthetic_documents(count, words_per_document, seed)
+    ]
+
+
+def benchmark_keyword_match(repeats: int = 20):
+    """Substring search per keyword against a token set, on long JDs and resumes"""
+    engine = SimilarityEngine(strict=True)
+    rows = []
+    for job_words, resume_words in ((300, 800), (1500, 3000), (3000, 10000)):
+        job_text = _letter_words(1, job_words, seed=29)[0]
+        resume_text = _letter_words(1, resume_words, seed=31)[0]
+        resume, job = {'text': resume_text}, {'text': job_text}
+        legacy_ms, _ = _measure(lambda: _legacy_keyword_match(resume_text, job_text), repeats)
+        token_ms, _ = _measure(lambda: engine._calculate_keyword_match(resume, job), repeats)
+        rows.append((f"{job_words} JD x {resume_words} resume words", legacy_ms, token_ms))
+
+    print("\nKeyword coverage")
+    print("-" * 60)
+    print(f"{'document sizes':<34}{'substring ms':>13}{'token ms':>13}")
+    for name, legacy_ms, token_ms in rows:
+        print(f"{name:<34}{legacy_ms:>13.2f}{token_ms:>13.2f}")
+
+    # Cases where whole-word matching deliberately differs from substring search
+    cases = [
+        ('manage', 'management experience'),
+        ('python', 'python3 and django'),
+        ('java', 'javascript developer'),
+        ('data', 'big-data pipelines'),
+    ]
+    print("\nSemantics: keyword found in resume text?")
+    print("-" * 60)
+    print(f"{'keyword':<10}{'resume text':<26}{'substring':>11}{'token':>8}")
+    for keyword, resume_text in cases:
+        substring = keyword in resume_text.lower()
+        token = keyword in set(KEYWORD_PATTERN.findall(resume_text.lower()))
+        print(f"{keyword:<10}{resume_text:<26}{str(substring):>11}{str(token):>8}")
+
+
+def benchmark_prepared_document(repeats: int = 30):
+    """Each component walking the feature dict itself against one shared PreparedDocument"""
+    engine = SimilarityEngine(strict=True)
+    sample_words = _letter_words(1, 4000, seed=37)[0].split()
+    extras = ' python django postgresql kubernetes 5 years of experience bachelor'
+
+    def feature_dict(word_count: int, offset: int) -> dict:
+        # Shaped like TextPreprocessor.get_feature_vector output
+        return {
+            'text_features': {'processed_text': ' '.join(sample_words[offset:offset + word_count]) + extras,
+                              'word_count': word_count},
+            'skill_features': {'programming_count': 3, 'programming_list': ['python']},
+            'entity_features': {'PERSON_count': 1},
+            'section_features': {'has_experience': True}
+        }
+
+    components = [
+        engine._calculate_skill_match, engine._calculate_experience_match,
+        engine._calculate_education_match, engine._calculate_keyword_match
+    ]
+
+    print("\nDocument preparation (skill, experience, education and keyword components)")
+    print("-" * 60)
+    print(f"{'resume words':<34}{'per-component ms':>17}{'shared ms':>11}")
+    for word_count in (300, 1500, 3500):
+        resume, job = feature_dict(word_count, 0), feature_dict(400, 100)
+
+        def per_component():
+            for component in components:
+                component(resume, job)
+
+        def shared():
+            prepared_resume, prepared_job = engine.prepare(resume), engine.prepare(job)
+            for component in components:
+                component(prepared_resume, prepared_job)
+
+        per_component_ms, _ = _measure(per_component, repeats)
+        shared_ms, _ = _measure(shared, repeats)
+        print(f"{word_count:<34}{per_component_ms:>17.3f}{shared_ms:>11.3f}")
+
+    for _ in range(repeats):
+        engine.calculate_similarity(feature_dict(1500, 0), feature_dict(400, 100))
+    print(f"\nEngine instrumentation after {repeats} calculate_similarity calls: {engine.stats()}")
+
+
+def benchmark_skill_prefilter(pool_sizes: Tuple[int, ...] = (1000, 10000, 100000), repeats: int = 5):
+    """Required-skill coverage for a stored pool: per-resume set matching against packed bitmasks"""
+    taxonomy = SkillTaxonomy()
+    rng = random.Random(43)
+    job_skills = rng.sample(taxonomy.skill_ids, 8)
+    job_mask = taxonomy.skill_mask(job_skills)
+
+    print("\nSkill prefilter (8 required skills)")
+    print("-" * 60)
+    print(f"{'stored resumes':<22}{'set match ms':>13}{'bitmask ms':>13}{'pack ms':>12}")
+    for pool_size in pool_sizes:
+        pool = [rng.sample(taxonomy.skill_ids, rng.randint(2, 15)) for _ in range(pool_size)]
+        masks = [taxonomy.skill_mask(skills) for skills in pool]
+        packed = taxonomy.pack_masks(masks)
+
+        set_ms, _ = _measure(lambda: [len(taxonomy.match(skills, job_skills)[0]) for skills in pool], repeats)
+        mask_ms, _ = _measure(lambda: taxonomy.mask_overlap(packed, job_mask), repeats)
+        pack_ms, _ = _measure(lambda: taxonomy.pack_masks(masks), repeats)
+        print(f"{pool_size:<22}{set_ms:>13.2f}{mask_ms:>13.2f}{pack_ms:>12.2f}")
+
+        expected = [len(taxonomy.match(skills, job_skills)[0]) for skills in pool]
+        if taxonomy.mask_overlap(packed, job_mask)['matched'].tolist() != expected:
+            print("  MISMATCH between set and bitmask matching")
+            sys.exit(1)
+
+
+def benchmark_cascade_rank(pool_sizes: Tuple[int, ...] = (500, 2000), top_k: int = 10, repeats: int = 2):
+    """Full vectorized ranking against the bound-pruned cascade, in every semantic mode"""
+    rng = random.Random(47)
+    skills = ['python', 'java', 'sql', 'docker', 'aws', 'react', 'kubernetes', 'django', 'git', 'linux']
+    levels = ['bachelor', 'master', 'phd', '']
+    texts = _synthetic_documents(max(pool_sizes) + 1, words_per_document=300, seed=53)
+    documents = [
+        {'text': f"{text} {' '.join(rng.sample(skills, rng.randint(0, 7)))} "
+                 f"{rng.randint(0, 9)} years of experience {rng.choice(levels)}"}
+        for text in texts
+    ]
+    job = {'text': f"{texts[0]} python django sql docker aws 5 years of experience bachelor"}
+
+    print(f"\nCascade ranking (top {top_k})")
+    print("-" * 60)
+    print(f"{'mode / pool':<24}{'full ms':>10}{'cascade ms':>12}{'pruned':>9}{'same':>6}")
+    for model_name in SimilarityEngine.SEMANTIC_MODELS:
+        engine = SimilarityEngine(model_name=model_name, strict=True)
+        profile = engine.build_job_profile(job)
+        for pool_size in pool_sizes:
+            pool = [engine.prepare(document).prepare_all() for document in documents[1:pool_size + 1]]
+            full_ms, _ = _measure(lambda: engine.rank(pool, profile, top_k), repeats)
+            cascade_ms, _ = _measure(lambda: engine.cascade_rank(pool, profile, top_k), repeats)
+            full = engine.rank(pool, profile, top_k)
+            cascaded, counts = engine.cascade_rank(pool, profile, top_k)
+            same = [entry['index'] for entry in full] == [entry['index'] for entry in cascaded]
+            print(f"{model_name + ' / ' + str(pool_size):<24}{full_ms:>10.1f}{cascade_ms:>12.1f}"
+                  f"{counts['pruned']:>9}{str(same):>6}")
+
+
+def _text_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """A PDF with a text layer, generated with PyMuPDF"""
+    import fitz
+
+    document = fitz.open()
+    words = _letter_words(1, pages * lines_per_page * 8, seed=59)[0].split()
+    for page_number in range(pages):
+        page = document.new_page()
+        start = page_number * lines_per_page * 8
+        lines = [' '.join(words[offset:offset + 8]) for offset in range(start, start + lines_per_page * 8, 8)]
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), '\n'.join(lines), fontsize=9)
+    pdf_bytes = document.tobytes()
+    document.close()
+    return pdf_bytes
+
+
+def benchmark_pdf_extraction(page_counts: Tuple[int, ...] = (1, 5, 20), repeats: int = 5):
+    """pdfplumber on every PDF against the probe picking the cheapest engine"""
+    import pdfplumber
+    from text_extractor import TextExtractor
+
+    extractor = TextExtractor()
+
+    def pdfplumber_only(pdf_bytes: bytes) -> str:
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            return '\n'.join(filter(None, (page.extract_text() for page in pdf.pages)))
+
+    print("\nPDF text extraction")
+    print("-" * 60)
+    print(f"{'pages':<10}{'pdfplumber ms':>15}{'probed ms':>12}{'engine':>12}")
+    for pages in page_counts:
+        pdf_bytes = _text_pdf(pages)
+        plumber_ms, _ = _measure(lambda: pdfplumber_only(pdf_bytes), repeats)
+        probed_ms, _ = _measure(lambda: extractor._extract_from_pdf('benchmark.pdf', pdf_bytes), repeats)
+        engine = extractor._extract_from_pdf('benchmark.pdf', pdf_bytes)['extraction_method']
+        print(f"{pages:<10}{plumber_ms:>15.1f}{probed_ms:>12.1f}{engine:>12}")
+
+
+def benchmark_parallel_pdf(page_counts: Tuple[int, ...] = (1, 5, 50), workers: int = 4, repeats: int = 3):
+    """Serial per-page extraction against splitting pages across a warm page pool"""
+    from text_extractor import TextExtractor
+
+    serial = TextExtractor(pdf_workers=1)
+    parallel = TextExtractor(pdf_workers=workers, pdf_parallel_min_pages=1)
+    started = time.perf_counter()
+    parallel._get_page_pool().submit(sum, ()).result()
+    print(f"\nParallel PDF extraction ({workers} workers, pool start {(time.perf_counter() - started) * 1000:.0f} ms)")
+    print("-" * 60)
+    print(f"{'engine / pages':<24}{'serial ms':>12}{'parallel ms':>13}{'same':>7}")
+    try:
+        for engine in ('PyPDF2', 'pdfplumber'):
+            for pages in page_counts:
+                pdf_bytes = _text_pdf(pages)
+                probe = serial._probe_pdf(pdf_bytes)
+                serial_ms, _ = _measure(lambda: serial._extract_pdf_pages(engine, pdf_bytes, probe, {}), repeats)
+                parallel_ms, _ = _measure(lambda: parallel._extract_pdf_pages(engine, pdf_bytes, probe, {}), repeats)
+                same = (serial._extract_pdf_pages(engine, pdf_bytes, probe, {})
+                        == parallel._extract_pdf_pages(engine, pdf_bytes, probe, {}))
+                print(f"{engine + ' / ' + str(pages):<24}{serial_ms:>12.1f}{parallel_ms:>13.1f}{str(same):>7}")
+    finally:
+        parallel.close()
+
+
+def _scanned_pdf(pdf_bytes: bytes, dpi: int = 150) -> Tuple[bytes, List[str]]:
+    """(image-only copy of pdf_bytes, each page's original text), standing in for scanned resumes"""
+    import fitz
+
+    source = fitz.open(stream=pdf_bytes, filetype='pdf')
+    scanned = fitz.open()
+    texts = []
+    for page in source:
+        texts.append(page.get_text())
+        scanned.new_page(width=page.rect.width, height=page.rect.height).insert_image(
+            page.rect, stream=page.get_pixmap(dpi=dpi).tobytes('png')
+        )
+    scanned_bytes = scanned.tobytes()
+    source.close()
+    scanned.close()
+    return scanned_bytes, texts
+
+
+def _character_accuracy(expected: str, actual: str) -> float:
+    return difflib.SequenceMatcher(None, ' '.join(expected.split()), ' '.join(actual.split())).ratio()
+
+
+def benchmark_ocr_preparation(pages: int = 3, repeats: int = 3):
+    """Page rendering settings for OCR: preparation time, tesseract time and character accuracy.
+
+    legacy is the old default-resolution RGB render through PNG. Without a tesseract
+    binary only the preparation column is measured.
+    """
+    import fitz
+    import pytesseract
+    from PIL import Image
+    from text_extractor import TextExtractor
+
+    try:
+        pytesseract.get_tesseract_version()
+        has_tesseract = True
+    except Exception:
+        has_tesseract = False
+
+    def legacy_render(page):
+        return Image.open(io.BytesIO(page.get_pixmap().tobytes('png')))
+
+    settings = [('legacy', legacy_render)]
+    for dpi, binarize in ((72, False), (150, False), (200, False), (200, True), (300, True)):
+        extractor = TextExtractor(ocr_dpi=dpi, ocr_binarize=binarize)
+        settings.append((f"{dpi} dpi gray{' + binarize' if binarize else ''}", extractor._render_page_for_ocr))
+
+    scanned_bytes, texts = _scanned_pdf(_text_pdf(pages))
+    document = fitz.open(stream=scanned_bytes, filetype='pdf')
+    print(f"\nOCR page preparation ({pages} scanned pages)")
+    print("-" * 60)
+    if not has_tesseract:
+        print("tesseract is not installed; OCR time and accuracy are skipped")
+    print(f"{'setting':<26}{'prepare ms':>12}{'ocr ms':>10}{'accuracy':>10}")
+    try:
+        for name, render in settings:
+            prepare_ms, _ = _measure(lambda: [render(page) for page in document], repeats)
+            ocr_ms, accuracy = float('nan'), float('nan')
+            if has_tesseract:
+                images = [render(page) for page in document]
+                started = time.perf_counter()
+                ocr_texts = [pytesseract.image_to_string(image) for image in images]
+                ocr_ms = (time.perf_counter() - started) * 1000
+                accuracy = float(np.mean([_character_accuracy(expected, actual)
+                                          for expected, actual in zip(texts, ocr_texts)]))
+            print(f"{name:<26}{prepare_ms:>12.1f}{ocr_ms:>10.0f}{accuracy:>10.3f}")
+    finally:
+        document.close()
+
+
+BENCHMARKS: Dict[str, Callable[..., None]] = {
+    'sparse_semantic': benchmark_sparse_semantic,
+    'hashing_semantic': benchmark_hashing_semantic,
+    'thread_safety': stress_thread_safety,
+    'keyword_match': benchmark_keyword_match,
+    'prepared_document': benchmark_prepared_document,
+    'skill_prefilter': benchmark_skill_prefilter,
+    'cascade_rank': benchmark_cascade_rank,
+    'pdf_extraction': benchmark_pdf_extraction,
+    'parallel_pdf': benchmark_parallel_pdf,
+    'ocr_preparation': benchmark_ocr_preparation,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ResuMatch micro-benchmarks")
+    parser.add_argument('benchmarks', nargs='*', help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
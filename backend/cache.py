@@ -0,0 +1,207 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def content_hash(*parts: Union[str, bytes]) -> str:
+    """SHA-256 over the given parts, separated so ('ab', 'c') and ('a', 'bc') differ"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(part)
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class DiskCache:
+    """JSON files named by key under a directory; oldest files are pruned past max_entries.
+
+    Files are tracked in write order, so pruning removes the oldest ones without
+    listing the directory. The index is rebuilt from the directory at start and
+    after every max_entries writes, which picks up files from other processes
+    sharing it.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 10000):
+        self.directory = directory
+        self.max_entries = max(1, max_entries)
+        self._writes = 0
+        self._order = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._resync()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as cache_file:
+                value = json.load(cache_file)
+            self.hits += 1
+            return value
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+                json.dump(value, cache_file, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write cache entry {key}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._order[key] = None
+            self._order.move_to_end(key)
+            self._writes += 1
+            resync = self._writes % self.max_entries == 0
+        if resync:
+            self._resync()
+        self._prune()
+
+    def _resync(self):
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+        except OSError as e:
+            logger.warning(f"Disk cache scan failed: {str(e)}")
+            return
+        with self._lock:
+            self._order = OrderedDict((entry.name[:-len('.json')], None) for entry in entries)
+
+    def _prune(self):
+        with self._lock:
+            excess = max(0, len(self._order) - self.max_entries)
+            stale = [self._order.popitem(last=False)[0] for _ in range(excess)]
+        for key in stale:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Disk cache pruning failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'directory': self.directory,
+            'entries': len(self._order),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class TieredCache:
+    """In-memory LRU in front of an optional DiskCache; disk hits are promoted to memory"""
+
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str, default: Any = None) -> Tuple[Any, Optional[str]]:
+        """Return (value, tier) where tier is 'memory', 'disk' or None on a miss"""
+        value = self.memory.get(key)
+        if value is not None:
+            return value, 'memory'
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                return value, 'disk'
+
+        return default, None
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        if self.disk is not None:
+            stats['disk_hits'] = self.disk.hits
+            stats['disk_misses'] = self.disk.misses
+        return stats
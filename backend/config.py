@@ -15,9 +15,18 @@ class Config:
     RESULTS_DIR = os.getenv("RESULTS_DIR", "results")
     DEFAULT_SENTENCE_MODEL = os.getenv("SENTENCE_MODEL", "all-MiniLM-L6-v2")
     BACKUP_SENTENCE_MODEL = os.getenv("BACKUP_SENTENCE_MODEL", "paraphrase-MiniLM-L6-v2")
+    TFIDF_MODEL_PATH = os.getenv("TFIDF_MODEL_PATH", os.path.join("models", "tfidf_vectorizer.joblib"))
+    TFIDF_DTYPE = os.getenv("TFIDF_DTYPE", "float64").lower()
+    SEMANTIC_MODE = os.getenv("SEMANTIC_MODE", "tfidf").lower()
+    HASHING_FEATURES = int(os.getenv("HASHING_FEATURES", 2 ** 18))
+    KEYWORD_IDF_WEIGHTING = os.getenv("KEYWORD_IDF_WEIGHTING", "False").lower() == "true"
     USE_GPU = os.getenv("USE_GPU", "False").lower() == "true"
-    MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 10))
+    MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 500))
     PROCESSING_TIMEOUT = int(os.getenv("PROCESSING_TIMEOUT", 300))
+    EXECUTION_MODE = os.getenv("EXECUTION_MODE", "inline").lower()
+    ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", os.cpu_count() or 1))
+    BATCH_PARALLELISM = int(os.getenv("BATCH_PARALLELISM", ANALYSIS_WORKERS))
+    RANK_CASCADE = os.getenv("RANK_CASCADE", "True").lower() == "true"
     SIMILARITY_WEIGHTS = {
         'semantic_similarity': float(os.getenv("WEIGHT_SEMANTIC", 0.35)),
         'skill_match': float(os.getenv("WEIGHT_SKILL", 0.25)),
@@ -34,8 +43,18 @@ class Config:
         'extract_skills': True,
         'extract_sections': True
     }
-    OCR_CONFIG = r'--oem 3 --psm 6'
+    OCR_CONFIG = os.getenv("OCR_CONFIG", r'--oem 3 --psm 6')
     OCR_ENABLED = os.getenv("OCR_ENABLED", "True").lower() == "true"
+    # Pages are rendered at OCR_DPI unless that would exceed OCR_MAX_IMAGE_SIDE pixels (0: no limit); uploads
+    # are downscaled to it. The defaults match the earlier 72 dpi render until a tesseract run measures others
+    OCR_DPI = int(os.getenv("OCR_DPI", 72))
+    OCR_MAX_IMAGE_SIDE = int(os.getenv("OCR_MAX_IMAGE_SIDE", 0))
+    OCR_BINARIZE = os.getenv("OCR_BINARIZE", "False").lower() == "true"
+    # Concurrent tesseract processes per extractor
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", 1 if EXECUTION_MODE == "process" else min(4, os.cpu_count() or 1)))
+    # Worker processes per extractor for long PDFs; analysis workers in process mode already run in parallel
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", 1 if EXECUTION_MODE == "process" else min(4, os.cpu_count() or 1)))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 20))
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_FILE = os.getenv("LOG_FILE", "resumatch.log")
@@ -43,12 +62,32 @@ class Config:
     API_KEY_REQUIRED = os.getenv("API_KEY_REQUIRED", "False").lower() == "true"
     API_KEY = os.getenv("API_KEY", None)
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///resumatch.db")
+    PERSIST_ANALYSES = os.getenv("PERSIST_ANALYSES", "True").lower() == "true"
+    DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", 50))
+    DB_FLUSH_INTERVAL = float(os.getenv("DB_FLUSH_INTERVAL", 0.5))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
     CACHE_TTL = int(os.getenv("CACHE_TTL", 3600))
+    JOB_CACHE_SIZE = int(os.getenv("JOB_CACHE_SIZE", 512))
+    SCORE_CACHE_SIZE = int(os.getenv("SCORE_CACHE_SIZE", 1024))
+    EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", 256))
+    OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", 1024))
+    EXTRACTION_DISK_CACHE = os.getenv("EXTRACTION_DISK_CACHE", "False").lower() == "true"
+    EXTRACTION_DISK_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_DISK_CACHE_MAX_ENTRIES", 10000))
+    RESULT_STORE_MAX_ENTRIES = int(os.getenv("RESULT_STORE_MAX_ENTRIES", 1000))
+    RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", 256 * 1024 * 1024))
+    RESULT_SPILL_ENABLED = os.getenv("RESULT_SPILL_ENABLED", "True").lower() == "true"
+    RESULT_SPILL_MAX_ENTRIES = int(os.getenv("RESULT_SPILL_MAX_ENTRIES", 100000))
     @classmethod
     def get_model_config(cls) -> Dict[str, Any]:
         return {
             'sentence_model': cls.DEFAULT_SENTENCE_MODEL,
+            'tfidf_model_path': cls.TFIDF_MODEL_PATH,
+            'tfidf_dtype': cls.TFIDF_DTYPE,
+            'semantic_mode': cls.SEMANTIC_MODE,
+            'hashing_features': cls.HASHING_FEATURES,
+            'keyword_idf_weighting': cls.KEYWORD_IDF_WEIGHTING,
             'backup_model': cls.BACKUP_SENTENCE_MODEL,
             'use_gpu': cls.USE_GPU,
             'weights': cls.SIMILARITY_WEIGHTS
@@ -59,9 +98,19 @@ class Config:
             'max_file_size': cls.MAX_FILE_SIZE,
             'allowed_extensions': cls.ALLOWED_EXTENSIONS,
             'max_batch_size': cls.MAX_BATCH_SIZE,
+            'batch_parallelism': cls.BATCH_PARALLELISM,
+            'rank_cascade': cls.RANK_CASCADE,
             'timeout': cls.PROCESSING_TIMEOUT,
+            'execution_mode': cls.EXECUTION_MODE,
+            'analysis_workers': cls.ANALYSIS_WORKERS,
             'ocr_enabled': cls.OCR_ENABLED,
             'ocr_config': cls.OCR_CONFIG,
+            'ocr_workers': cls.OCR_WORKERS,
+            'ocr_dpi': cls.OCR_DPI,
+            'ocr_max_image_side': cls.OCR_MAX_IMAGE_SIDE,
+            'ocr_binarize': cls.OCR_BINARIZE,
+            'pdf_workers': cls.PDF_WORKERS,
+            'pdf_parallel_min_pages': cls.PDF_PARALLEL_MIN_PAGES,
             'preprocessing_options': cls.DEFAULT_PREPROCESSING_OPTIONS
         }
     @classmethod
@@ -72,7 +121,10 @@ class Config:
         validation_results['upload_dir_exists'] = os.path.exists(cls.UPLOAD_DIR)
         validation_results['results_dir_exists'] = os.path.exists(cls.RESULTS_DIR)
         validation_results['max_file_size_valid'] = cls.MAX_FILE_SIZE > 0
-        validation_results['batch_size_valid'] = 1 <= cls.MAX_BATCH_SIZE <= 100
+        validation_results['batch_size_valid'] = 1 <= cls.MAX_BATCH_SIZE <= 1000
+        validation_results['execution_mode_valid'] = cls.EXECUTION_MODE in ('inline', 'process')
+        validation_results['tfidf_dtype_valid'] = cls.TFIDF_DTYPE in ('float32', 'float64')
+        validation_results['semantic_mode_valid'] = cls.SEMANTIC_MODE in ('tfidf', 'hashing')
         return validation_results
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -83,7 +135,7 @@ class ProductionConfig(Config):
     RELOAD = False
     LOG_LEVEL = "WARNING"
     MAX_FILE_SIZE = 20 * 1024 * 1024
-    MAX_BATCH_SIZE = 5
+    MAX_BATCH_SIZE = 200
     PROCESSING_TIMEOUT = 180
 class TestingConfig(Config):
     DEBUG = True
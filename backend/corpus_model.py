@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Offline TF-IDF fitting on a reference corpus of resumes and job descriptions.
+
+Usage:
+    python corpus_model.py path/to/corpus [--output models/tfidf_vectorizer.joblib]
+"""
+
+import argparse
+import logging
+import os
+from typing import List, Optional
+
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from config import config
+from similarity_engine import SimilarityEngine, create_tfidf_vectorizer
+from text_extractor import TextExtractor
+from text_preprocessor import TextPreprocessor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def collect_corpus_texts(corpus_dir: str, extractor: Optional[TextExtractor] = None,
+                         preprocessor: Optional[TextPreprocessor] = None) -> List[str]:
+    """Extract and preprocess every supported file under corpus_dir.
+
+    Each document is reduced to the same text the similarity engine sees at
+    request time, so the fitted vocabulary matches what transform() receives.
+    """
+    extractor = extractor or TextExtractor()
+    preprocessor = preprocessor or TextPreprocessor()
+    engine = SimilarityEngine()
+
+    texts = []
+    for root, _, filenames in os.walk(corpus_dir):
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() not in config.ALLOWED_EXTENSIONS:
+                continue
+            path = os.path.join(root, filename)
+            with open(path, 'rb') as corpus_file:
+                extraction_result = extractor.extract_text(filename, corpus_file.read())
+            if not extraction_result['success'] or not extraction_result['text'].strip():
+                logger.warning(f"Skipping {path}: no text extracted")
+                continue
+
+            processed = preprocessor.preprocess_text(extraction_result['text'])
+            text = engine._extract_text_from_data(preprocessor.get_feature_vector(processed))
+            if text:
+                texts.append(text)
+
+    return texts
+
+
+def fit_tfidf_model(texts: List[str]) -> TfidfVectorizer:
+    if len(texts) < 2:
+        raise ValueError("At least two documents are needed to fit the TF-IDF model")
+
+    vectorizer = create_tfidf_vectorizer(config.TFIDF_DTYPE)
+    vectorizer.fit(texts)
+    # stop_words_ only serves introspection and can be large; older scikit-learn keeps it
+    if hasattr(vectorizer, 'stop_words_'):
+        del vectorizer.stop_words_
+    return vectorizer
+
+
+def save_tfidf_model(vectorizer: TfidfVectorizer, path: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # Uncompressed on purpose: joblib can only memory-map arrays from uncompressed files
+    joblib.dump(vectorizer, path)
+
+
+def load_tfidf_model(path: Optional[str]) -> Optional[TfidfVectorizer]:
+    """Load a fitted vectorizer with its arrays memory-mapped, or None if there is none"""
+    if not path or not os.path.exists(path):
+        logger.info("No fitted TF-IDF model found, semantic similarity will fit per request")
+        return None
+
+    try:
+        vectorizer = joblib.load(path, mmap_mode='r')
+        logger.info(f"Loaded TF-IDF model from {path} ({len(vectorizer.vocabulary_)} terms)")
+        return vectorizer
+    except Exception as e:
+        logger.error(f"Failed to load TF-IDF model from {path}: {str(e)}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the TF-IDF model on a corpus of resumes and job descriptions")
+    parser.add_argument('corpus_dir', help="Directory searched recursively for resume and job description files")
+    parser.add_argument('--output', default=config.TFIDF_MODEL_PATH, help="Where to write the fitted model")
+    args = parser.parse_args()
+
+    texts = collect_corpus_texts(args.corpus_dir)
+    vectorizer = fit_tfidf_model(texts)
+    save_tfidf_model(vectorizer, args.output)
+    print(f"Fitted TF-IDF on {len(texts)} documents, {len(vectorizer.vocabulary_)} terms -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
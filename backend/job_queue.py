@@ -0,0 +1,329 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Sequence
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Text, func, insert, select, update
+
+from analysis_database import create_database_engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+JOB_STATUSES = ('queued', 'running', 'completed', 'failed')
+
+metadata = MetaData()
+
+jobs_table = Table(
+    'analysis_jobs', metadata,
+    Column('job_id', String(36), primary_key=True),
+    Column('status', String(16), nullable=False, index=True),
+    Column('stage', String(32)),
+    Column('progress', Text, nullable=False),
+    Column('filename', String(255)),
+    Column('upload_path', String(512)),
+    Column('job_description', Text, nullable=False),
+    Column('analysis_id', String(36)),
+    Column('error', Text),
+    Column('created_at', DateTime, nullable=False, index=True),
+    Column('updated_at', DateTime, nullable=False)
+)
+
+
+class JobQueue:
+    """Durable FIFO of analysis jobs; uploads are kept on disk until their job finishes"""
+
+    def __init__(self, database_url: str, upload_dir: str, stages: Sequence[str]):
+        self.engine = create_database_engine(database_url)
+        self.upload_dir = upload_dir
+        self.stages = tuple(stages)
+        os.makedirs(upload_dir, exist_ok=True)
+        metadata.create_all(self.engine)
+
+    def submit(self, filename: str, file_content: bytes, job_description: str) -> str:
+        job_id = str(uuid.uuid4())
+        upload_path = os.path.join(self.upload_dir, job_id)
+        with open(upload_path, 'wb') as upload_file:
+            upload_file.write(file_content)
+
+        now = datetime.now()
+        progress = {
+            'percent': 0,
+            'stages': {stage: {'status': 'pending'} for stage in self.stages}
+        }
+        with self.engine.begin() as connection:
+            connection.execute(insert(jobs_table).values(
+                job_id=job_id,
+                status='queued',
+                stage='queued',
+                progress=json.dumps(progress),
+                filename=filename,
+                upload_path=upload_path,
+                job_description=job_description,
+                created_at=now,
+                updated_at=now
+            ))
+        return job_id
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Move the oldest queued job to running and return it, or None when the queue is empty"""
+        with self.engine.begin() as connection:
+            row = connection.execute(
+                select(jobs_table)
+                .where(jobs_table.c.status == 'queued')
+                .order_by(jobs_table.c.created_at)
+                .limit(1)
+            ).mappings().first()
+            if row is None:
+                return None
+
+            # The status guard makes the claim safe when several workers poll the same database
+            claimed = connection.execute(
+                update(jobs_table)
+                .where(jobs_table.c.job_id == row['job_id'], jobs_table.c.status == 'queued')
+                .values(status='running', updated_at=datetime.now())
+            )
+            if claimed.rowcount != 1:
+                return None
+        return dict(row)
+
+    def _update_progress(self, job_id: str, mutate: Callable[[Dict[str, Any]], None], **values):
+        with self.engine.begin() as connection:
+            progress_json = connection.execute(
+                select(jobs_table.c.progress).where(jobs_table.c.job_id == job_id)
+            ).scalar_one_or_none()
+            if progress_json is None:
+                return
+            progress = json.loads(progress_json)
+            mutate(progress)
+            connection.execute(
+                update(jobs_table)
+                .where(jobs_table.c.job_id == job_id)
+                .values(progress=json.dumps(progress), updated_at=datetime.now(), **values)
+            )
+
+    def start_stage(self, job_id: str, stage: str):
+        now = datetime.now().isoformat()
+
+        def mutate(progress):
+            for stage_progress in progress['stages'].values():
+                if stage_progress['status'] == 'running':
+                    stage_progress.update(status='completed', finished_at=now)
+            progress['stages'].setdefault(stage, {}).update(status='running', started_at=now)
+            if stage in self.stages:
+                progress['percent'] = round(100 * self.stages.index(stage) / len(self.stages))
+
+        self._update_progress(job_id, mutate, stage=stage)
+
+    def _finish(self, job_id: str, status: str, **values):
+        now = datetime.now().isoformat()
+
+        def mutate(progress):
+            for stage_progress in progress['stages'].values():
+                if stage_progress['status'] == 'running':
+                    stage_progress.update(status=status, finished_at=now)
+            if status == 'completed':
+                for stage_progress in progress['stages'].values():
+                    if stage_progress['status'] == 'pending':
+                        stage_progress.update(status='completed', finished_at=now)
+                progress['percent'] = 100
+
+        self._update_progress(job_id, mutate, status=status, stage=status, **values)
+
+    def complete(self, job_id: str, analysis_id: str):
+        self._finish(job_id, 'completed', analysis_id=analysis_id)
+        self._remove_upload(job_id)
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, 'failed', error=error)
+        self._remove_upload(job_id)
+
+    def _remove_upload(self, job_id: str):
+        try:
+            os.remove(os.path.join(self.upload_dir, job_id))
+        except FileNotFoundError:
+            pass
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                select(
+                    jobs_table.c.job_id, jobs_table.c.status, jobs_table.c.stage,
+                    jobs_table.c.progress, jobs_table.c.filename, jobs_table.c.analysis_id,
+                    jobs_table.c.error, jobs_table.c.created_at, jobs_table.c.updated_at
+                ).where(jobs_table.c.job_id == job_id)
+            ).mappings().first()
+        if row is None:
+            return None
+        job = dict(row)
+        job['progress'] = json.loads(job['progress'])
+        job['created_at'] = job['created_at'].isoformat()
+        job['updated_at'] = job['updated_at'].isoformat()
+        return job
+
+    def recover_stale(self, stale_after: float) -> int:
+        """Requeue running jobs not updated for stale_after seconds, i.e. left behind by a dead worker"""
+        cutoff = datetime.now() - timedelta(seconds=stale_after)
+        with self.engine.begin() as connection:
+            requeued = connection.execute(
+                update(jobs_table)
+                .where(jobs_table.c.status == 'running', jobs_table.c.updated_at < cutoff)
+                .values(status='queued', stage='queued', updated_at=datetime.now())
+            )
+        if requeued.rowcount:
+            logger.warning(f"Requeued {requeued.rowcount} interrupted analysis jobs")
+        return requeued.rowcount
+
+    def heartbeat(self, job_id: str):
+        """Mark a running job as alive, so recover_stale leaves it alone however long it takes"""
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(jobs_table)
+                .where(jobs_table.c.job_id == job_id, jobs_table.c.status == 'running')
+                .values(updated_at=datetime.now())
+            )
+
+    def requeue(self, job_id: str):
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(jobs_table)
+                .where(jobs_table.c.job_id == job_id, jobs_table.c.status == 'running')
+                .values(status='queued', stage='queued', updated_at=datetime.now())
+            )
+
+    def counts(self) -> Dict[str, int]:
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(jobs_table.c.status, func.count()).group_by(jobs_table.c.status)
+            ).all()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def dispose(self):
+        self.engine.dispose()
+
+
+class JobWorkerPool:
+    """A fixed number of asyncio workers that drain a JobQueue through an async handler.
+
+    Running jobs send a heartbeat every quarter of stale_after, and running jobs
+    without one for stale_after are requeued on the same schedule. Jobs of a server
+    process that died are therefore picked up again even if it restarts right away.
+    """
+
+    def __init__(self, job_queue: JobQueue,
+                 handler: Callable[[Dict[str, Any], bytes, Callable[[str], None]], Awaitable[str]],
+                 workers: int = 2, poll_interval: float = 1.0, stale_after: float = 300.0):
+        self.job_queue = job_queue
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._wakeup = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self.job_queue.recover_stale(self.stale_after)
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f'analysis-job-worker-{index}')
+            for index in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._recover_stale_jobs(), name='analysis-job-recovery'))
+        logger.info(f"Started {self.workers} analysis job workers")
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    @property
+    def heartbeat_interval(self) -> float:
+        return max(self.stale_after / 4, 0.01)
+
+    async def _recover_stale_jobs(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if await asyncio.to_thread(self.job_queue.recover_stale, self.stale_after):
+                    self.notify()
+            except Exception as e:
+                logger.error(f"Failed to recover stale analysis jobs: {str(e)}")
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self.job_queue.heartbeat, job_id)
+            except Exception as e:
+                logger.warning(f"Failed to record heartbeat of analysis job {job_id}: {str(e)}")
+
+    async def _wait_for_work(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            # Periodic polling also picks up jobs submitted by other server processes
+            pass
+        self._wakeup.clear()
+
+    async def _work(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.job_queue.claim_next)
+            except Exception as e:
+                logger.error(f"Failed to claim analysis job: {str(e)}")
+                job = None
+
+            if job is None:
+                await self._wait_for_work()
+                continue
+
+            await self._run_job(job)
+
+    async def _run_job(self, job: Dict[str, Any]):
+        job_id = job['job_id']
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            with open(job['upload_path'], 'rb') as upload_file:
+                file_content = upload_file.read()
+
+            # Stage writes run in a thread, each after the previous one, so they never block the loop
+            stage_writes: List[asyncio.Task] = []
+
+            def on_stage(stage: str):
+                previous = stage_writes[-1] if stage_writes else None
+                stage_writes.append(asyncio.create_task(self._write_stage(previous, job_id, stage)))
+
+            try:
+                analysis_id = await self.handler(job, file_content, on_stage)
+            finally:
+                await asyncio.gather(*stage_writes, return_exceptions=True)
+            await asyncio.to_thread(self.job_queue.complete, job_id, analysis_id)
+        except asyncio.CancelledError:
+            # Shutting down mid-job: hand the job back so the next start picks it up immediately
+            self.job_queue.requeue(job_id)
+            raise
+        except Exception as e:
+            error = getattr(e, 'detail', None) or str(e)
+            logger.error(f"Analysis job {job_id} failed: {error}")
+            await asyncio.to_thread(self.job_queue.fail, job_id, str(error))
+        finally:
+            heartbeat.cancel()
+
+    async def _write_stage(self, previous: Optional[asyncio.Task], job_id: str, stage: str):
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await asyncio.to_thread(self.job_queue.start_stage, job_id, stage)
+        except Exception as e:
+            logger.warning(f"Failed to record stage {stage} of analysis job {job_id}: {str(e)}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -1,19 +1,27 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import asyncio
 import aiofiles
+import json
 import os
 import shutil
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import uuid
+import numpy as np
 
+from config import config
 from text_extractor import TextExtractor
 from text_preprocessor import TextPreprocessor
-from similarity_engine import SimilarityEngine
+from analysis_pipeline import AnalysisPipeline, ExtractionError, PIPELINE_STAGES, create_similarity_engine
+from analysis_executor import AnalysisExecutor
+from cache import DiskCache
+from result_store import ResultStore
+from analysis_database import AnalysisDatabase, SkillMaskIndex
+from job_queue import JobQueue, JobWorkerPool
 
 
 logging.basicConfig(
@@ -65,92 +73,72 @@ os.makedirs("results", exist_ok=True)
 
 text_extractor = TextExtractor()
 text_preprocessor = TextPreprocessor()
-similarity_engine = SimilarityEngine()
+similarity_engine = create_similarity_engine()
+analysis_executor = AnalysisExecutor(
+    mode=config.EXECUTION_MODE,
+    max_workers=config.ANALYSIS_WORKERS,
+    pipeline=AnalysisPipeline(text_extractor, text_preprocessor, similarity_engine)
+)
 
 
-analysis_results = {}
+analysis_results = ResultStore(
+    max_entries=config.RESULT_STORE_MAX_ENTRIES,
+    max_bytes=config.RESULT_STORE_MAX_BYTES,
+    spill_cache=DiskCache(
+        os.path.join(config.RESULTS_DIR, 'analyses'),
+        max_entries=config.RESULT_SPILL_MAX_ENTRIES
+    ) if config.RESULT_SPILL_ENABLED else None
+)
+analysis_database = AnalysisDatabase(
+    config.DATABASE_URL,
+    batch_size=config.DB_WRITE_BATCH_SIZE,
+    flush_interval=config.DB_FLUSH_INTERVAL
+) if config.PERSIST_ANALYSES else None
+skill_mask_index = SkillMaskIndex(
+    analysis_database, similarity_engine.skill_taxonomy
+) if analysis_database is not None else None
 
 
 class ResuMatchAnalyzer:
 
     def __init__(self):
-        self.extractor = text_extractor
-        self.preprocessor = text_preprocessor
-        self.similarity_engine = similarity_engine
+        self.executor = analysis_executor
+
+    async def analyze_match(self, resume_file: UploadFile, job_description: str,
+                            explain: bool = True) -> Dict[str, Any]:
+        resume_content = await resume_file.read()
+        return await self.analyze_content(resume_file.filename, resume_content, job_description, explain=explain)
 
-    async def analyze_match(self, resume_file: UploadFile, job_description: str) -> Dict[str, Any]:
+    async def analyze_content(self, filename: str, resume_content: bytes, job_description: str,
+                              progress: Optional[Callable[[str], None]] = None,
+                              explain: bool = True) -> Dict[str, Any]:
         try:
             analysis_id = str(uuid.uuid4())
 
-            logger.info("Extracting text from resume...")
-            resume_content = await resume_file.read()
-
-            extraction_result = self.extractor.extract_text(
-                resume_file.filename,
-                resume_content
-            )
-
-            if not extraction_result['success']:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Failed to extract text from resume: {extraction_result.get('error', 'Unknown error')}"
-                )
-
-            resume_text = extraction_result['text']
-
-            logger.info("Preprocessing texts...")
-            resume_processed = self.preprocessor.preprocess_text(resume_text)
-            job_processed = self.preprocessor.preprocess_text(job_description)
-
-            logger.info("Extracting features...")
-            resume_features = self.preprocessor.get_feature_vector(resume_processed)
-            job_features = self.preprocessor.get_feature_vector(job_processed)
-
-            logger.info("Calculating similarity...")
-            similarity_result = self.similarity_engine.calculate_similarity(
-                resume_features,
-                job_features
+            analysis_body = await self.executor.analyze(
+                filename,
+                resume_content,
+                job_description,
+                progress=progress,
+                explain=explain
             )
 
             analysis_result = {
                 'analysis_id': analysis_id,
                 'timestamp': datetime.now().isoformat(),
-                'resume_file': resume_file.filename,
-                'extraction_info': {
-                    'file_type': extraction_result['file_type'],
-                    'extraction_method': extraction_result['extraction_method'],
-                    'metadata': extraction_result.get('metadata', {})
-                },
-                'resume_analysis': {
-                    'statistics': resume_processed.get('statistics', {}),
-                    'entities': resume_processed.get('entities', {}),
-                    'skills': resume_processed.get('skills', {}),
-                    'sections': resume_processed.get('sections', {}),
-                    'features': resume_features
-                },
-                'job_analysis': {
-                    'statistics': job_processed.get('statistics', {}),
-                    'entities': job_processed.get('entities', {}),
-                    'skills': job_processed.get('skills', {}),
-                    'sections': job_processed.get('sections', {}),
-                    'features': job_features
-                },
-                'similarity_analysis': similarity_result,
-                'quality_scores': {
-                    'resume_quality': self.preprocessor._calculate_text_quality_score(
-                        resume_text, resume_processed
-                    ),
-                    'job_quality': self.preprocessor._calculate_text_quality_score(
-                        job_description, job_processed
-                    )
-                }
+                **analysis_body
             }
 
-            analysis_results[analysis_id] = analysis_result
+            # Sizing the result and spilling evicted ones to disk stay off the event loop
+            await asyncio.to_thread(analysis_results.put, analysis_id, analysis_result)
+            if analysis_database is not None:
+                analysis_database.save(analysis_result)
 
             logger.info(f"Analysis completed successfully. ID: {analysis_id}")
             return analysis_result
 
+        except ExtractionError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Analysis failed: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -159,28 +147,72 @@ class ResuMatchAnalyzer:
 analyzer = ResuMatchAnalyzer()
 
 
+async def run_analysis_job(job: Dict[str, Any], file_content: bytes, on_stage: Callable[[str], None]) -> str:
+    result = await analyzer.analyze_content(
+        job['filename'],
+        file_content,
+        job['job_description'],
+        progress=on_stage
+    )
+    return result['analysis_id']
+
+
+job_queue = JobQueue(
+    config.DATABASE_URL,
+    os.path.join(config.UPLOAD_DIR, 'jobs'),
+    PIPELINE_STAGES
+)
+job_workers = JobWorkerPool(
+    job_queue,
+    run_analysis_job,
+    workers=config.JOB_WORKERS,
+    poll_interval=config.JOB_POLL_INTERVAL,
+    stale_after=config.PROCESSING_TIMEOUT
+)
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    job_workers.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    await job_workers.stop()
+    job_queue.dispose()
+    analysis_executor.shutdown()
+    text_extractor.close()
+    if analysis_database is not None:
+        analysis_database.close()
+
+
 @app.get("/")
 async def home():
     return {"message": "ResuMatch API", "status": "active"}
 
 
+def validate_analysis_request(resume: UploadFile, job_description: str):
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+    allowed_types = {'.pdf', '.doc', '.docx', '.txt'}
+    file_ext = os.path.splitext(resume.filename)[1].lower()
+    if file_ext not in allowed_types:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Unsupported file type: {file_ext}. Allowed types: {', '.join(allowed_types)}"
+        )
+
+
 @app.post("/analyze")
 async def analyze_resume_job_match(
     background_tasks: BackgroundTasks,
     resume: UploadFile = File(...),
-    job_description: str = Form(...)
+    job_description: str = Form(...),
+    explain: bool = Form(True)
 ):
     try:
-        if not job_description.strip():
-            raise HTTPException(status_code=400, detail="Job description cannot be empty")
-        allowed_types = {'.pdf', '.doc', '.docx', '.txt'}
-        file_ext = os.path.splitext(resume.filename)[1].lower()
-        if file_ext not in allowed_types:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Unsupported file type: {file_ext}. Allowed types: {', '.join(allowed_types)}"
-            )
-        result = await analyzer.analyze_match(resume, job_description)
+        validate_analysis_request(resume, job_description)
+        result = await analyzer.analyze_match(resume, job_description, explain)
         return JSONResponse(content={
             'analysis_id': result['analysis_id'],
             'similarity_analysis': result['similarity_analysis'],
@@ -196,9 +228,10 @@ async def analyze_resume_job_match(
 async def analyse_resume_job_match(
     background_tasks: BackgroundTasks,
     resume: UploadFile = File(...),
-    job_description: str = Form(...)
+    job_description: str = Form(...),
+    explain: bool = Form(True)
 ):
-    return await analyze_resume_job_match(background_tasks, resume, job_description)
+    return await analyze_resume_job_match(background_tasks, resume, job_description, explain)
 
 @app.get("/analyze")
 async def analyze_get_method():
@@ -217,66 +250,291 @@ async def analyse_get_method():
 
 @app.get("/analysis/{analysis_id}")
 async def get_analysis_result(analysis_id: str):
-    if analysis_id not in analysis_results:
+    analysis_result = await asyncio.to_thread(analysis_results.get, analysis_id)
+    if analysis_result is None and analysis_database is not None:
+        # Results from before a restart or from another worker only live in the database
+        analysis_result = await asyncio.to_thread(analysis_database.get, analysis_id)
+    if analysis_result is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
-    return JSONResponse(content=analysis_results[analysis_id])
+    similarity = analysis_result.get('similarity_analysis')
+    if similarity is not None and 'recommendations' not in similarity:
+        # Scored without explanations (e.g. in a batch); generate them now that they are asked for
+        analysis_result = {**analysis_result, 'similarity_analysis': similarity_engine.explain(similarity)}
+    return JSONResponse(content=analysis_result)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_analysis_job(
+    resume: UploadFile = File(...),
+    job_description: str = Form(...)
+):
+    validate_analysis_request(resume, job_description)
+    resume_content = await resume.read()
+    try:
+        job_id = await asyncio.to_thread(job_queue.submit, resume.filename, resume_content, job_description)
+    except Exception as e:
+        logger.error(f"Failed to queue analysis job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to queue analysis job")
+    job_workers.notify()
+    return JSONResponse(
+        status_code=202,
+        content={'job_id': job_id, 'status': 'queued', 'status_url': f"/jobs/{job_id}"}
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job['status'] == 'completed' and job['analysis_id']:
+        analysis_result = await asyncio.to_thread(analysis_results.get, job['analysis_id'])
+        if analysis_result is None and analysis_database is not None:
+            analysis_result = await asyncio.to_thread(analysis_database.get, job['analysis_id'])
+        if analysis_result is not None:
+            job['result'] = {
+                'analysis_id': analysis_result['analysis_id'],
+                'similarity_analysis': analysis_result['similarity_analysis'],
+                'timestamp': analysis_result['timestamp']
+            }
+    return JSONResponse(content=job)
+
+
+@app.get("/api/analyses")
+async def list_analysis_scores(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    limit: int = 100
+):
+    if analysis_database is None:
+        raise HTTPException(status_code=503, detail="Analysis persistence is disabled")
+    limit = max(1, min(limit, 1000))
+    scores = await asyncio.to_thread(analysis_database.list_scores, since, until, min_score, limit)
+    return JSONResponse(content={'count': len(scores), 'analyses': scores})
+
+
+def filter_stored_resumes(taxonomy: str, job_mask: int, min_coverage: float, require_all: bool,
+                          limit: int) -> Dict[str, Any]:
+    """Stored resumes covering the job's skills, ranked by coverage, using AND/popcount on skill masks"""
+    rows, masks, packed = skill_mask_index.snapshot(taxonomy)
+    skill_taxonomy = similarity_engine.skill_taxonomy
+    required = bin(job_mask).count('1')
+    if not rows:
+        return {'searched': 0, 'matched': 0, 'analyses': []}
+
+    overlap = skill_taxonomy.mask_overlap(packed, job_mask)
+    coverage = overlap['matched'] / required
+    keep = overlap['missing'] == 0 if require_all else coverage >= min_coverage
+    candidates = np.flatnonzero(keep)
+    order = candidates[np.lexsort((-overlap['jaccard'][candidates], -coverage[candidates]))][:limit]
+
+    return {
+        'searched': len(rows),
+        'matched': len(candidates),
+        'analyses': [
+            {
+                **rows[index],
+                'coverage': round(float(coverage[index]), 4),
+                'jaccard': round(float(overlap['jaccard'][index]), 4),
+                'missing_skills': skill_taxonomy.skills_in_mask(
+                    job_mask & ~skill_taxonomy.covered_mask(masks[index])
+                )
+            }
+            for index in order
+        ]
+    }
+
+
+@app.post("/api/analyses/prefilter")
+async def prefilter_stored_resumes(
+    job_description: str = Form(...),
+    min_coverage: float = Form(0.0),
+    require_all: bool = Form(False),
+    limit: int = Form(100)
+):
+    if analysis_database is None:
+        raise HTTPException(status_code=503, detail="Analysis persistence is disabled")
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+
+    taxonomy, job_mask = await analysis_executor.call('job_skill_mask', job_description)
+    if job_mask == 0:
+        raise HTTPException(status_code=400, detail="No known skills found in job description")
+
+    limit = max(1, min(limit, 1000))
+    result = await asyncio.to_thread(filter_stored_resumes, taxonomy, job_mask, min_coverage, require_all, limit)
+    return JSONResponse(content={
+        'required_skills': similarity_engine.skill_taxonomy.skills_in_mask(job_mask),
+        **result
+    })
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "executor": analysis_executor.stats()
+    }
 
 
-@app.post("/batch-analyze")
-async def batch_analyze(
-    resumes: List[UploadFile] = File(...),
-    job_description: str = Form(...)
-):
-    try:
-        if len(resumes) > 10:
-            raise HTTPException(status_code=400, detail="Maximum 10 resumes allowed per batch")
-        results = []
-        for resume in resumes:
+async def stream_batch_results(uploads: List[Tuple[str, bytes]], job_description: str, explain: bool = False):
+    semaphore = asyncio.Semaphore(max(1, config.BATCH_PARALLELISM))
+
+    async def analyze_upload(index: int, filename: str, content: bytes) -> Dict[str, Any]:
+        async with semaphore:
             try:
-                result = await analyzer.analyze_match(resume, job_description)
-                results.append({
-                    'filename': resume.filename,
+                result = await analyzer.analyze_content(filename, content, job_description, explain=explain)
+                return {
+                    'index': index,
+                    'filename': filename,
                     'analysis_id': result['analysis_id'],
                     'overall_score': result['similarity_analysis']['overall_score'],
                     'status': 'success'
-                })
+                }
+            except HTTPException as e:
+                return {'index': index, 'filename': filename, 'error': str(e.detail), 'status': 'failed'}
             except Exception as e:
-                results.append({
-                    'filename': resume.filename,
-                    'error': str(e),
-                    'status': 'failed'
-                })
-        successful_results = [r for r in results if r['status'] == 'success']
-        failed_results = [r for r in results if r['status'] == 'failed']
-        successful_results.sort(key=lambda x: x['overall_score'], reverse=True)
-        return JSONResponse(content={
-            'total_resumes': len(resumes),
-            'successful': len(successful_results),
-            'failed': len(failed_results),
-            'results': successful_results + failed_results
-        })
-    except HTTPException:
-        raise
+                return {'index': index, 'filename': filename, 'error': str(e), 'status': 'failed'}
+
+    tasks = [
+        asyncio.create_task(analyze_upload(index, filename, content))
+        for index, (filename, content) in enumerate(uploads)
+    ]
+    results = []
+    try:
+        for next_completed in asyncio.as_completed(tasks):
+            result = await next_completed
+            results.append(result)
+            yield json.dumps({'type': 'result', **result}) + '\n'
+    finally:
+        # Stop outstanding work if the client disconnects mid-stream
+        for task in tasks:
+            task.cancel()
+
+    successful_results = [r for r in results if r['status'] == 'success']
+    failed_results = [r for r in results if r['status'] == 'failed']
+    successful_results.sort(key=lambda x: x['overall_score'], reverse=True)
+    failed_results.sort(key=lambda x: x['index'])
+    yield json.dumps({
+        'type': 'summary',
+        'total_resumes': len(uploads),
+        'successful': len(successful_results),
+        'failed': len(failed_results),
+        'results': successful_results + failed_results
+    }) + '\n'
+
+
+@app.post("/batch-analyze")
+async def batch_analyze(
+    resumes: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    explain: bool = Form(False)
+):
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+    if len(resumes) > config.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {config.MAX_BATCH_SIZE} resumes allowed per batch"
+        )
+    try:
+        # Read every upload before streaming starts; the request's files are closed once the handler returns
+        uploads = [(resume.filename, await resume.read()) for resume in resumes]
     except Exception as e:
-        logger.error(f"Batch analysis failed: {str(e)}")
+        logger.error(f"Batch upload read failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Batch analysis failed")
 
+    return StreamingResponse(
+        stream_batch_results(uploads, job_description, explain),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.post("/rank")
+async def rank_resumes(
+    resumes: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    top_k: int = Form(10),
+    cascade: Optional[bool] = Form(None),
+    explain: bool = Form(False)
+):
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+    if len(resumes) > config.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {config.MAX_BATCH_SIZE} resumes allowed per ranking"
+        )
+
+    uploads = [(resume.filename, await resume.read()) for resume in resumes]
+    semaphore = asyncio.Semaphore(max(1, config.BATCH_PARALLELISM))
+
+    async def prepare_upload(filename: str, content: bytes):
+        async with semaphore:
+            return await analysis_executor.call('prepare_resume', filename, content)
+
+    prepared = await asyncio.gather(
+        *(prepare_upload(filename, content) for filename, content in uploads),
+        return_exceptions=True
+    )
+
+    candidates = []
+    failed = []
+    for index, ((filename, _), features) in enumerate(zip(uploads, prepared)):
+        if isinstance(features, BaseException):
+            failed.append({'index': index, 'filename': filename, 'error': str(features)})
+        else:
+            candidates.append((index, filename, features))
+
+    try:
+        ranked, counts = await analysis_executor.call(
+            'rank',
+            [features for _, _, features in candidates],
+            job_description,
+            max(1, top_k),
+            config.RANK_CASCADE if cascade is None else cascade,
+            explain
+        )
+    except Exception as e:
+        logger.error(f"Ranking failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Ranking failed")
+
+    results = []
+    for position, entry in enumerate(ranked, start=1):
+        index, filename, _ = candidates[entry['index']]
+        results.append({'rank': position, **entry, 'index': index, 'filename': filename})
+
+    return JSONResponse(content={
+        'total_resumes': len(uploads),
+        'ranked': len(candidates),
+        'pruned': counts['pruned'],
+        'failed': failed,
+        'results': results
+    })
+
 
 @app.get("/api/stats")
 async def get_statistics():
     return JSONResponse(content={
-        'total_analyses': len(analysis_results),
+        'total_analyses': analysis_results.stored,
+        'result_store': analysis_results.stats(),
+        'database': analysis_database.stats() if analysis_database is not None else None,
+        'jobs': await asyncio.to_thread(job_queue.counts),
         'models_loaded': {
             'text_extractor': text_extractor is not None,
             'text_preprocessor': text_preprocessor is not None,
-            'similarity_engine': similarity_engine.sentence_model is not None
+            'similarity_engine': similarity_engine is not None,
+            'semantic_model': similarity_engine.model_name,
+            'tfidf_corpus_model': similarity_engine.corpus_fitted
         },
         'supported_formats': text_extractor.supported_formats,
+        'executor': analysis_executor.stats(),
+        'caches': analysis_executor.cache_stats(),
+        # Worker processes keep their own engines, so timings are only available inline
+        'scoring': similarity_engine.stats() if analysis_executor.mode == 'inline' else None,
         'uptime': datetime.now().isoformat()
     })
 
@@ -0,0 +1,58 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# spawn rather than fork: the server process already runs an event loop and threads,
+# which a forked child would inherit in whatever state they happened to be in
+SPAWN_CONTEXT = multiprocessing.get_context('spawn')
+
+
+class LazyProcessPool:
+    """A spawn-context ProcessPoolExecutor, started on first use and replaced once broken.
+
+    A worker that dies (a crash, an OOM kill) poisons the whole pool: every later
+    submit raises BrokenProcessPool. Callers that catch it call discard(), and the
+    next get() starts a fresh pool.
+    """
+
+    def __init__(self, name: str, max_workers: int, initializer: Optional[Callable] = None,
+                 initargs: tuple = ()):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=SPAWN_CONTEXT,
+                    initializer=self.initializer,
+                    initargs=self.initargs
+                )
+                logger.info(f"Started {self.name} process pool with {self.max_workers} workers")
+            return self._pool
+
+    def discard(self, pool: Optional[ProcessPoolExecutor] = None):
+        """Drop a broken pool; with pool given, only if another caller has not replaced it already"""
+        with self._lock:
+            if self._pool is None or (pool is not None and pool is not self._pool):
+                return
+            broken, self._pool = self._pool, None
+        logger.error(f"{self.name} process pool is broken, a new one starts on next use")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
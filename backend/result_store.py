@@ -0,0 +1,101 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from cache import DiskCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ResultStore:
+    """Analysis results capped by entry count and approximate JSON size.
+
+    Least recently used results are evicted first; with a spill cache they are
+    written to disk on eviction and remain retrievable by id. put() serializes and
+    may write files, so async callers run it in a thread.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 256 * 1024 * 1024,
+                 spill_cache: Optional[DiskCache] = None):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.spill_cache = spill_cache
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+        self.stored = 0
+        self.evictions = 0
+        self.spilled = 0
+        self.spill_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _estimate_size(result: Dict[str, Any]) -> int:
+        return len(json.dumps(result, default=str))
+
+    def put(self, analysis_id: str, result: Dict[str, Any]):
+        size = self._estimate_size(result)
+        evicted = []
+        with self._lock:
+            previous = self._entries.pop(analysis_id, None)
+            if previous is not None:
+                self.memory_bytes -= previous[0]
+
+            self._entries[analysis_id] = (size, result)
+            self.memory_bytes += size
+            self.stored += 1
+
+            # Always keep the newest entry, even if it alone exceeds max_bytes
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self.memory_bytes > self.max_bytes
+            ):
+                evicted_id, (evicted_size, evicted_result) = self._entries.popitem(last=False)
+                self.memory_bytes -= evicted_size
+                self.evictions += 1
+                evicted.append((evicted_id, evicted_result))
+            if self.spill_cache is not None:
+                self.spilled += len(evicted)
+
+        # Disk writes happen outside the lock so lookups are not blocked on I/O
+        if self.spill_cache is not None:
+            for evicted_id, evicted_result in evicted:
+                self.spill_cache.set(evicted_id, evicted_result)
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(analysis_id)
+            if entry is not None:
+                self._entries.move_to_end(analysis_id)
+                return entry[1]
+
+        if self.spill_cache is not None:
+            result = self.spill_cache.get(analysis_id)
+            if result is not None:
+                self.spill_hits += 1
+                return result
+
+        self.misses += 1
+        return None
+
+    def __contains__(self, analysis_id: str) -> bool:
+        return self.get(analysis_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries_in_memory': len(self._entries),
+            'max_entries': self.max_entries,
+            'memory_bytes': self.memory_bytes,
+            'max_bytes': self.max_bytes,
+            'stored': self.stored,
+            'evictions': self.evictions,
+            'spilled': self.spilled,
+            'spill_hits': self.spill_hits,
+            'misses': self.misses,
+            'spill_enabled': self.spill_cache is not None
+        }
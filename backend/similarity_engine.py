@@ -1,47 +1,352 @@
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
-from typing import Dict, List, Tuple, Any, Optional
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
+from typing import Callable, Dict, List, Tuple, Any, Optional, Union
+from collections import Counter
+from functools import cached_property
+from types import MappingProxyType
+import hashlib
+import heapq
 import logging
 import re
+import threading
+import time
 import warnings
 warnings.filterwarnings("ignore")
 
+from skill_taxonomy import SKILL_CATEGORIES, SkillTaxonomy
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keyword candidates on both sides: whole lowercase words of four or more letters
+KEYWORD_PATTERN = re.compile(r'\b[a-z]{4,}\b')
+
+
+# Look for patterns like "5 years", "3+ years", etc.
+EXPERIENCE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
+    r'(\d+)\+?\s*years?\s*in',
+    r'experience\s*:\s*(\d+)\+?\s*years?',
+    r'(\d+)\+?\s*years?\s*working'
+))
+
+EDUCATION_KEYWORDS = MappingProxyType({
+    'phd': ('phd', 'ph.d', 'doctorate', 'doctoral'),
+    'masters': ('masters', 'master', 'mba', 'm.s.', 'm.a.', 'ms ', 'ma '),
+    'bachelors': ('bachelors', 'bachelor', 'b.s.', 'b.a.', 'bs ', 'ba ', 'be ', 'b.e.'),
+    'associates': ('associates', 'associate', 'diploma'),
+    'high school': ('high school', 'secondary', '12th')
+})
+
+
+def create_tfidf_vectorizer(dtype=np.float64) -> TfidfVectorizer:
+    return TfidfVectorizer(max_features=5000, stop_words='english', ngram_range=(1, 2), dtype=dtype)
+
+
+def create_hashing_vectorizer(n_features: int = 2 ** 18, dtype=np.float64) -> HashingVectorizer:
+    # Same tokens as the TF-IDF vectorizer; alternate_sign=False keeps cosines non-negative
+    return HashingVectorizer(n_features=n_features, stop_words='english', ngram_range=(1, 2),
+                             alternate_sign=False, norm='l2', dtype=dtype)
+
+
+class PreparedDocument:
+    """One resume or job description reduced to what the scoring components read.
+    
+    Each view is computed on first use and then kept, so a document shared by all
+    components is walked, joined, lowercased and pattern-matched once per call
+    instead of once per component.
+    """
+    
+    VIEWS = ('text', 'lower_text', 'keyword_counts', 'terms', 'skills', 'skill_mask', 'experience_years',
+             'education_level')
+    
+    def __init__(self, data: Dict[str, Any], engine: 'SimilarityEngine'):
+        self.data = data
+        self._engine = engine
+    
+    @cached_property
+    def text(self) -> str:
+        return self._engine._extract_text_from_data(self.data)
+    
+    @cached_property
+    def lower_text(self) -> str:
+        return self.text.lower()
+    
+    @cached_property
+    def keyword_counts(self) -> Counter:
+        return Counter(KEYWORD_PATTERN.findall(self.lower_text))
+    
+    @cached_property
+    def terms(self) -> frozenset:
+        return frozenset(self.keyword_counts)
+    
+    @cached_property
+    def skills(self) -> List[str]:
+        return self._engine._find_skills(self)
+    
+    @cached_property
+    def skill_mask(self) -> int:
+        return self._engine.skill_taxonomy.skill_mask(self.skills)
+    
+    @cached_property
+    def experience_years(self) -> int:
+        return self._engine._find_experience_years(self.text)
+    
+    @cached_property
+    def education_level(self) -> str:
+        return self._engine._find_education_level(self.lower_text)
+    
+    def prepare_all(self) -> 'PreparedDocument':
+        for view in self.VIEWS:
+            getattr(self, view)
+        return self
+
+
+class JobProfile:
+    """A job description's requirements, derived once and reused for every candidate.
+    
+    Holds the skill ids, required years, education level and rank, keyword weights and,
+    when the engine's vectorizer is fixed (corpus-fitted TF-IDF or hashing), the job's
+    semantic vector. Built by SimilarityEngine.build_job_profile and accepted wherever a
+    job is; engine_signature records the settings it was built with. Shared instances
+    must not be mutated.
+    """
+    
+    def __init__(self, text: str, skills: Tuple[str, ...], experience_years: int, education_level: str,
+                 education_rank: int, keyword_weights: Dict[str, float],
+                 vector: Optional[sparse.csr_matrix] = None, engine_signature: str = '', skill_mask: int = 0):
+        self.text = text
+        self.skills = tuple(skills)
+        self.skill_mask = skill_mask
+        self.experience_years = experience_years
+        self.education_level = education_level
+        self.education_rank = education_rank
+        self.keyword_weights = keyword_weights
+        self.vector = vector
+        self.engine_signature = engine_signature
+    
+    def prepare_all(self) -> 'JobProfile':
+        return self
+    
+    def to_dict(self) -> Dict[str, Any]:
+        vector = None
+        if self.vector is not None:
+            row = sparse.csr_matrix(self.vector)
+            vector = {
+                'dim': row.shape[1],
+                'dtype': row.dtype.name,
+                'indices': row.indices.tolist(),
+                'data': row.data.tolist()
+            }
+        return {
+            'text': self.text,
+            'skills': list(self.skills),
+            'skill_mask': format(self.skill_mask, 'x'),
+            'experience_years': self.experience_years,
+            'education_level': self.education_level,
+            'education_rank': self.education_rank,
+            'keyword_weights': dict(self.keyword_weights),
+            'vector': vector,
+            'engine_signature': self.engine_signature
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'JobProfile':
+        vector = data.get('vector')
+        if vector is not None:
+            vector = sparse.csr_matrix(
+                (np.asarray(vector['data'], dtype=vector['dtype']),
+                 np.asarray(vector['indices'], dtype=np.int32),
+                 np.array([0, len(vector['indices'])], dtype=np.int32)),
+                shape=(1, vector['dim'])
+            )
+        return cls(
+            text=data['text'],
+            skills=tuple(data['skills']),
+            skill_mask=int(data.get('skill_mask', '0'), 16),
+            experience_years=data['experience_years'],
+            education_level=data['education_level'],
+            education_rank=data['education_rank'],
+            keyword_weights=data['keyword_weights'],
+            vector=vector,
+            engine_signature=data.get('engine_signature', '')
+        )
+
+
 class SimilarityEngine:
-    def __init__(self, model_name: str = "tfidf"):
+    """Resume/job scoring that is safe to share between threads.
+    
+    Per-call state lives in local variables; shared artifacts (vectorizers, weights,
+    skill lists) are never mutated after construction, only replaced as a whole.
+    The timing counters behind stats() are the only shared writes and take a lock.
+    """
+    
+    VERSION = "1.0"
+    SEMANTIC_MODELS = ('tfidf', 'hashing')
+    # Candidates scored per cascade step, and slack for float error when comparing bounds
+    CASCADE_BATCH_SIZE = 64
+    CASCADE_TOLERANCE = 1e-9
+    
+    def __init__(self, model_name: str = "tfidf", tfidf_vectorizer: Optional[TfidfVectorizer] = None,
+                 dtype=np.float64, hashing_features: int = 2 ** 18,
+                 skill_taxonomy: Optional[SkillTaxonomy] = None, keyword_idf: bool = False,
+                 strict: bool = False):
+        if model_name not in self.SEMANTIC_MODELS:
+            raise ValueError(f"Unsupported semantic model: {model_name}. Use one of: {', '.join(self.SEMANTIC_MODELS)}")
+        
         self.model_name = model_name
-        self.tfidf_vectorizer = TfidfVectorizer(max_features=5000, stop_words='english', ngram_range=(1, 2))
+        self.dtype = np.dtype(dtype)
+        # Scoring errors normally log and score zero; strict re-raises them (benchmarks, tests)
+        self.strict = strict
+        # Feature hashing needs no fitted state: fixed memory, and safe to share between threads
+        self.hashing_vectorizer = (create_hashing_vectorizer(hashing_features, self.dtype)
+                                   if model_name == 'hashing' else None)
+        # A vectorizer fitted offline on a reference corpus (see corpus_model.py) is only
+        # ever used to transform; without one, this is an unfitted template cloned per call
+        self.corpus_fitted = tfidf_vectorizer is not None
+        self.tfidf_vectorizer = tfidf_vectorizer if self.corpus_fitted else create_tfidf_vectorizer(self.dtype)
+        # A refitted model can keep its vocabulary size, so profiles and cached scores key on its contents
+        self.corpus_fingerprint = self._vectorizer_fingerprint(self.tfidf_vectorizer) if self.corpus_fitted else None
+        # IDF weights for keyword coverage are only meaningful when learned from a corpus
+        self.keyword_idf = keyword_idf and self.corpus_fitted
+        if self.keyword_idf:
+            self._idf = np.asarray(self.tfidf_vectorizer.idf_)
+            self._unseen_idf = float(self._idf.max())
+            self._keyword_stop_words = frozenset(self.tfidf_vectorizer.get_stop_words() or ())
         
-        self.weights = {
+        self.weights = MappingProxyType({
             'semantic_similarity': 0.25,
             'skill_match': 0.40,
             'experience_match': 0.15,
             'education_match': 0.05,
             'keyword_match': 0.15
-        }
+        })
         
-        # Predefined skill sets for better matching
-        self.skill_categories = {
-            'programming': ['python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'php', 'go', 'rust', 'swift', 'kotlin'],
-            'web_development': ['html', 'css', 'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'fastapi'],
-            'databases': ['sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'oracle', 'sqlite'],
-            'cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'gitlab'],
-            'data_science': ['pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'r', 'stata', 'spss'],
-            'tools': ['git', 'linux', 'bash', 'vim', 'vscode', 'intellij', 'eclipse', 'postman']
-        }
+        # Predefined skill sets for better matching; aliases and containment are precomputed once
+        self.skill_categories = SKILL_CATEGORIES
+        self.skill_taxonomy = skill_taxonomy or SkillTaxonomy(self.skill_categories)
+        
+        self._stats_lock = threading.Lock()
+        self._calls = 0
+        self._prepare_seconds = 0.0
+        self._scoring_seconds = 0.0
+        self._rank_calls = 0
+        self._rank_candidates = 0
+        self._rank_pruned = 0
+        
+        if self.hashing_vectorizer is not None:
+            logger.info(f"Initialized lightweight similarity engine with feature hashing ({hashing_features} features)")
+        else:
+            logger.info(
+                f"Initialized lightweight similarity engine with "
+                f"{'corpus-fitted' if self.corpus_fitted else 'per-request'} TF-IDF"
+            )
+    
+    @property
+    def signature(self) -> str:
+        """Identifies everything a JobProfile or cached score depends on besides the weights.
+        
+        Computed on access, so replacing skill_taxonomy changes it too.
+        """
+        return '/'.join([
+            self.model_name,
+            f"features{self.hashing_vectorizer.n_features}" if self.hashing_vectorizer is not None
+            else f"corpus{len(self.tfidf_vectorizer.vocabulary_)}-{self.corpus_fingerprint}" if self.corpus_fitted
+            else 'request',
+            'idf' if self.keyword_idf else 'count',
+            self.dtype.name,
+            self.skill_taxonomy.fingerprint
+        ])
+    
+    @staticmethod
+    def _vectorizer_fingerprint(vectorizer: TfidfVectorizer) -> str:
+        """Digest of a fitted vectorizer's vocabulary, in column order, and IDF weights"""
+        digest = hashlib.sha1('\n'.join(vectorizer.get_feature_names_out()).encode('utf-8'))
+        digest.update(np.asarray(vectorizer.idf_, dtype=np.float64).tobytes())
+        return digest.hexdigest()[:16]
+    
+    def update_weights(self, new_weights: Dict[str, float]):
+        weights = {**self.weights, **new_weights}
+        if abs(sum(weights.values()) - 1.0) > 0.001:
+            raise ValueError("Weights must sum to 1.0")
         
-        logger.info("Initialized lightweight similarity engine with TF-IDF")
+        # Swapped in as a whole, so in-flight calls keep scoring with the weights they started with
+        self.weights = MappingProxyType(weights)
+        logger.info(f"Updated weights: {weights}")
     
-    def calculate_similarity(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Any]:
+    def prepare(self, data: Union[Dict[str, Any], PreparedDocument, JobProfile]) -> Union[PreparedDocument, JobProfile]:
+        if isinstance(data, JobProfile):
+            if data.engine_signature != self.signature:
+                logger.warning(f"Rebuilding job profile made for engine {data.engine_signature} for {self.signature}")
+                return self.build_job_profile({'text': data.text})
+            return data
+        return data if isinstance(data, PreparedDocument) else PreparedDocument(data, self)
+    
+    def build_job_profile(self, job_data: Union[Dict[str, Any], PreparedDocument, JobProfile]) -> JobProfile:
+        job = self.prepare(job_data)
+        if isinstance(job, JobProfile):
+            return job
+        
+        vectorizer = self._fixed_vectorizer()
+        return JobProfile(
+            text=job.text,
+            skills=tuple(job.skills),
+            skill_mask=job.skill_mask,
+            experience_years=job.experience_years,
+            education_level=job.education_level,
+            education_rank=self._education_rank(job.education_level),
+            keyword_weights=self._keyword_weights(job.keyword_counts),
+            vector=vectorizer.transform([job.text]) if vectorizer is not None and job.text else None,
+            engine_signature=self.signature
+        )
+    
+    def _fixed_vectorizer(self):
+        """The vectorizer whose output does not depend on the other documents, if there is one"""
+        if self.hashing_vectorizer is not None:
+            return self.hashing_vectorizer
+        return self.tfidf_vectorizer if self.corpus_fitted else None
+    
+    def _job_keyword_weights(self, job: Union[PreparedDocument, JobProfile]) -> Dict[str, float]:
+        if isinstance(job, JobProfile):
+            return job.keyword_weights
+        return self._keyword_weights(job.keyword_counts)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            calls, prepare_seconds, scoring_seconds = self._calls, self._prepare_seconds, self._scoring_seconds
+            rank_calls, rank_candidates, rank_pruned = self._rank_calls, self._rank_candidates, self._rank_pruned
+        return {
+            'similarity_calls': calls,
+            'prepare_ms_total': round(prepare_seconds * 1000, 3),
+            'scoring_ms_total': round(scoring_seconds * 1000, 3),
+            'prepare_ms_avg': round(prepare_seconds * 1000 / calls, 3) if calls else 0.0,
+            'scoring_ms_avg': round(scoring_seconds * 1000 / calls, 3) if calls else 0.0,
+            'rank_calls': rank_calls,
+            'rank_candidates': rank_candidates,
+            'rank_pruned': rank_pruned
+        }
+    
+    def calculate_similarity(self, resume_data: Union[Dict[str, Any], PreparedDocument],
+                             job_data: Union[Dict[str, Any], PreparedDocument, JobProfile],
+                             explain: bool = True) -> Dict[str, Any]:
+        """Score one resume against one job.
+        
+        With explain=False the result is a compact score record (overall_score,
+        component_scores, matched_skills, missing_skills) and the narrative analysis and
+        recommendations are skipped; explain() adds them later if they are needed.
+        """
         try:
+            weights = self.weights
+            started = time.perf_counter()
+            resume_data = self.prepare(resume_data).prepare_all()
+            job_data = self.prepare(job_data).prepare_all()
+            prepared = time.perf_counter()
+            
             result = {
                 'overall_score': 0.0,
                 'component_scores': {},
-                'detailed_analysis': {},
-                'recommendations': [],
                 'matched_skills': [],
                 'missing_skills': []
             }
@@ -65,76 +370,316 @@ class SimilarityEngine:
             
             overall_score = 0
             for component, score in result['component_scores'].items():
-                weight = self.weights.get(component, 0)
+                weight = weights.get(component, 0)
                 overall_score += score * weight
-                
-            boosted_score = overall_score ** 0.75
-            final_score = min(100.0, boosted_score * 100 * 1.15)
             
-            result['overall_score'] = round(final_score, 2)
-            result['detailed_analysis'] = self._generate_analysis(result)
-            result['recommendations'] = self._generate_recommendations(result)
+            result['overall_score'] = round(float(self._scale_score(overall_score)), 2)
+            if explain:
+                result = self.explain(result)
+            
+            finished = time.perf_counter()
+            with self._stats_lock:
+                self._calls += 1
+                self._prepare_seconds += prepared - started
+                self._scoring_seconds += finished - prepared
             
             return result
             
         except Exception as e:
-            logger.error(f"Similarity calculation failed: {str(e)}")
-            return {
+            self._scoring_failed("Similarity calculation", e)
+            result = {
                 'overall_score': 0.0,
                 'component_scores': {},
-                'detailed_analysis': {},
-                'recommendations': [],
                 'matched_skills': [],
                 'missing_skills': []
             }
+            return {**result, 'detailed_analysis': {}, 'recommendations': []} if explain else result
+    
+    def _scoring_failed(self, what: str, error: Exception):
+        if self.strict:
+            raise error
+        logger.error(f"{what} failed: {str(error)}")
+    
+    def explain(self, score_record: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a score record from calculate_similarity or rank with detailed_analysis and recommendations added"""
+        return {
+            **score_record,
+            'detailed_analysis': self._generate_analysis(score_record),
+            'recommendations': self._generate_recommendations(score_record)
+        }
+    
+    @staticmethod
+    def _scale_score(weighted_score):
+        """Map the weighted component sum (0-1) to the 0-100 overall score; works on arrays too"""
+        boosted_score = np.power(weighted_score, 0.75)
+        return np.minimum(100.0, boosted_score * 100 * 1.15)
+    
+    def rank(self, resumes: List[Union[Dict[str, Any], PreparedDocument]],
+             job: Union[Dict[str, Any], PreparedDocument, JobProfile], top_k: int = 10) -> List[Dict[str, Any]]:
+        """Score many resumes against one job in a single vectorized pass and return the top_k.
+        
+        Differences from calling calculate_similarity per resume:
+        - Without a corpus-fitted model, TF-IDF is fitted once on all resumes plus the job,
+          so IDF reflects the whole pool.
+        - Results carry scores and skills only, no analysis or recommendations.
+        """
+        return self._rank(resumes, job, top_k, prune=False)[0]
+    
+    def cascade_rank(self, resumes: List[Union[Dict[str, Any], PreparedDocument]],
+                     job: Union[Dict[str, Any], PreparedDocument, JobProfile],
+                     top_k: int = 10) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """rank() in two stages, returning (ranked, counts); the ranking is the same as rank()'s.
+        
+        Skill, experience and education scores are cheap, and semantic and keyword scores
+        are at most 1, so the weights give every candidate an upper bound on its overall
+        score. Candidates are scored in order of that bound, and once the top_k exact
+        scores beat a candidate's bound it is pruned without computing its semantic
+        (or keyword) similarity. counts has the pool size and how many were pruned.
+        """
+        return self._rank(resumes, job, top_k, prune=True)
     
-    def _get_semantic_embeddings(self, texts: List[str]) -> np.ndarray:
-        """Generate TF-IDF based embeddings as a lightweight alternative to transformers"""
+    def _rank(self, resumes: List[Union[Dict[str, Any], PreparedDocument]],
+              job: Union[Dict[str, Any], PreparedDocument, JobProfile], top_k: int,
+              prune: bool) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        if not resumes:
+            return [], {'candidates': 0, 'semantic_scored': 0, 'pruned': 0}
+        
+        components = ['semantic_similarity', 'skill_match', 'experience_match', 'education_match', 'keyword_match']
+        weights = np.array([self.weights.get(component, 0) for component in components])
+        scores = np.zeros((len(resumes), len(components)))
+        resumes = [self.prepare(resume) for resume in resumes]
+        job = self.prepare(job)
+        resume_texts = [resume.text for resume in resumes]
+        top_k = max(0, top_k)
+        
+        job_skills = job.skills
+        if job_skills:
+            # Taxonomy skills are matched with AND/popcount over packed masks, other terms by name
+            skill_counts = self.skill_taxonomy.mask_overlap(
+                self.skill_taxonomy.pack_masks([resume.skill_mask for resume in resumes]), job.skill_mask
+            )['matched'].astype(float)
+            other_skills = [skill for skill in job_skills if skill not in self.skill_taxonomy.bit_index]
+            if other_skills:
+                skill_counts += [sum(skill in resume.skills for skill in other_skills) for resume in resumes]
+            scores[:, 1] = skill_counts / len(job_skills)
+        
+        if job.experience_years > 0:
+            resume_years = np.array([resume.experience_years for resume in resumes], dtype=float)
+            scores[:, 2] = np.minimum(1.0, resume_years / job.experience_years)
+        else:
+            scores[:, 2] = 1.0
+        
+        job_level = self._education_rank(job.education_level)
+        resume_levels = np.array([self._education_rank(resume.education_level) for resume in resumes], dtype=float)
+        scores[:, 3] = np.minimum(1.0, resume_levels / job_level)
+        
+        semantic_scorer = self._semantic_scorer(resume_texts, job)
+        if prune:
+            overall_scores = self._cascade_scores(resume_texts, job, scores, weights, top_k, semantic_scorer)
+        else:
+            everyone = np.arange(len(resumes))
+            scores[:, 0] = semantic_scorer(everyone)
+            scores[:, 4] = self._rank_keyword_match(resume_texts, job)
+            overall_scores = self._scale_score(scores @ weights)
+        semantic_scored = int(np.isfinite(overall_scores).sum())
+        
+        with self._stats_lock:
+            self._rank_calls += 1
+            self._rank_candidates += len(resumes)
+            self._rank_pruned += len(resumes) - semantic_scored
+        
+        # heapq.nlargest keeps only top_k candidates instead of sorting the whole pool
+        top_indices = heapq.nlargest(top_k, range(len(resumes)), key=overall_scores.__getitem__)
+        
+        ranked = []
+        for index in top_indices:
+            matched, missing = (self.skill_taxonomy.match(resumes[index].skills, job_skills)
+                                if job_skills else ([], []))
+            ranked.append({
+                'index': index,
+                'overall_score': round(float(overall_scores[index]), 2),
+                'component_scores': {component: float(scores[index, position])
+                                     for position, component in enumerate(components)},
+                'matched_skills': matched,
+                'missing_skills': missing
+            })
+        counts = {
+            'candidates': len(resumes),
+            'semantic_scored': semantic_scored,
+            'pruned': len(resumes) - semantic_scored
+        }
+        return ranked, counts
+    
+    def _cascade_scores(self, resume_texts: List[str], job: Union[PreparedDocument, JobProfile],
+                        scores: np.ndarray, weights: np.ndarray, top_k: int,
+                        semantic_scorer: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """Overall scores with the cheap components already in scores; pruned candidates get -inf"""
+        overall_scores = np.full(len(resume_texts), -np.inf)
+        if top_k == 0:
+            return overall_scores
+        
+        cheap_scores = scores[:, 1:4] @ weights[1:4]
+        # Bounds are compared after scaling, since scaling caps at 100 and can turn a lower sum into a tie
+        bounds = self._scale_score(cheap_scores + weights[0] + weights[4])
+        order = np.argsort(-bounds, kind='stable')
+        top_scores: List[float] = []
+        
+        batch_size = max(self.CASCADE_BATCH_SIZE, top_k)
+        for start in range(0, len(order), batch_size):
+            threshold = top_scores[0] - self.CASCADE_TOLERANCE if len(top_scores) == top_k else -np.inf
+            batch = order[start:start + batch_size]
+            batch = batch[bounds[batch] >= threshold]
+            if not len(batch):
+                # Bounds are sorted, so no later candidate can reach the top_k either
+                break
+            
+            batch_texts = [resume_texts[index] for index in batch]
+            scores[batch, 4] = self._rank_keyword_match(batch_texts, job)
+            keyword_bounds = self._scale_score(cheap_scores[batch] + weights[4] * scores[batch, 4] + weights[0])
+            batch = batch[keyword_bounds >= threshold]
+            if not len(batch):
+                continue
+            
+            scores[batch, 0] = semantic_scorer(batch)
+            overall_scores[batch] = self._scale_score(scores[batch] @ weights)
+            for score in overall_scores[batch]:
+                if len(top_scores) < top_k:
+                    heapq.heappush(top_scores, score)
+                elif score > top_scores[0]:
+                    heapq.heapreplace(top_scores, score)
+        return overall_scores
+    
+    def _rank_semantic_similarity(self, resume_texts: List[str], job: Union[PreparedDocument, JobProfile]) -> np.ndarray:
+        return self._semantic_scorer(resume_texts, job)(np.arange(len(resume_texts)))
+    
+    def _semantic_scorer(self, resume_texts: List[str],
+                         job: Union[PreparedDocument, JobProfile]) -> Callable[[np.ndarray], np.ndarray]:
+        """Function scoring resumes, by index into resume_texts, against the job.
+        
+        The vectorizer and job vector are set up once, and a per-request TF-IDF is fitted
+        on the whole pool, so a resume's score does not depend on which subset it is in.
+        """
+        def no_similarity(indices: np.ndarray) -> np.ndarray:
+            return np.zeros(len(indices))
+        
         try:
-            if len(texts) == 1:
-                # For single text, we need to fit and transform
-                embeddings = self.tfidf_vectorizer.fit_transform(texts)
+            if not job.text:
+                return no_similarity
+            vectorizer = self._fixed_vectorizer()
+            if isinstance(job, JobProfile) and job.vector is not None:
+                job_vector = job.vector
             else:
-                # For multiple texts, fit on all and transform all
-                embeddings = self.tfidf_vectorizer.fit_transform(texts)
-            
-            return embeddings.toarray()
+                if vectorizer is None:
+                    vectorizer = clone(self.tfidf_vectorizer).fit(resume_texts + [job.text])
+                job_vector = vectorizer.transform([job.text])
         except Exception as e:
-            logger.error(f"TF-IDF embedding generation failed: {str(e)}")
-            # Return dummy embeddings if TF-IDF fails
-            return np.random.rand(len(texts), 100)
+            self._scoring_failed("Vectorized semantic similarity", e)
+            return no_similarity
+        
+        def score(indices: np.ndarray) -> np.ndarray:
+            try:
+                texts = [resume_texts[index] for index in indices]
+                # Rows are L2-normalized, so a sparse dot product with the job row is the cosine similarity
+                similarities = (vectorizer.transform(texts) @ job_vector.T).toarray().ravel()
+                similarities[np.array([not text for text in texts], dtype=bool)] = 0.0
+                return np.clip(similarities, 0.0, 1.0)
+            except Exception as e:
+                self._scoring_failed("Vectorized semantic similarity", e)
+                return np.zeros(len(indices))
+        return score
+    
+    def _rank_keyword_match(self, resume_texts: List[str], job: Union[PreparedDocument, JobProfile]) -> np.ndarray:
+        keyword_weights = self._job_keyword_weights(job)
+        if not keyword_weights:
+            return np.zeros(len(resume_texts))
+        
+        keywords = list(keyword_weights)
+        vectorizer = CountVectorizer(vocabulary=keywords, binary=True, lowercase=True,
+                                     token_pattern=KEYWORD_PATTERN.pattern)
+        presence = vectorizer.transform(resume_texts)
+        weights = np.array([keyword_weights[keyword] for keyword in keywords], dtype=float)
+        return np.asarray(presence @ weights).ravel() / weights.sum()
     
-    def _calculate_semantic_similarity(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> float:
+    def _keyword_weights(self, keyword_counts: Counter) -> Dict[str, float]:
+        """Job keywords weighted by their number of occurrences, times their corpus IDF when keyword_idf is on.
+        
+        With IDF, stop words are dropped and words the corpus never saw get the highest IDF.
+        """
+        if not self.keyword_idf:
+            return dict(keyword_counts)
+        
+        vocabulary = self.tfidf_vectorizer.vocabulary_
+        return {
+            keyword: count * (float(self._idf[vocabulary[keyword]]) if keyword in vocabulary else self._unseen_idf)
+            for keyword, count in keyword_counts.items()
+            if keyword not in self._keyword_stop_words
+        }
+    
+    @staticmethod
+    def _education_rank(education_level: str) -> int:
+        education_hierarchy = {
+            'phd': 6, 'doctorate': 6, 'doctoral': 6,
+            'masters': 5, 'master': 5, 'mba': 5, 'ms': 5, 'ma': 5,
+            'bachelors': 4, 'bachelor': 4, 'bs': 4, 'ba': 4, 'be': 4,
+            'associates': 3, 'associate': 3, 'diploma': 3,
+            'high school': 2, 'secondary': 2,
+            'none': 1
+        }
+        return education_hierarchy.get(education_level.lower(), 1)
+    
+    def _get_semantic_embeddings(self, texts: List[str]) -> Optional[sparse.csr_matrix]:
+        """Generate TF-IDF (or hashed term frequency) embeddings as a lightweight alternative to transformers.
+        
+        Rows are sparse and L2-normalized; they are never densified.
+        """
         try:
-            resume_text = self._extract_text_from_data(resume_data)
-            job_text = self._extract_text_from_data(job_data)
+            if self.hashing_vectorizer is not None:
+                return self.hashing_vectorizer.transform(texts)
+            if self.corpus_fitted:
+                # Vocabulary and IDF come from the reference corpus; never refit them per request
+                return self.tfidf_vectorizer.transform(texts)
+            # Fit a private copy so concurrent calls never share a half-fitted vocabulary
+            return clone(self.tfidf_vectorizer).fit_transform(texts)
+        except Exception as e:
+            self._scoring_failed("TF-IDF embedding generation", e)
+            return None
+    
+    def _calculate_semantic_similarity(self, resume_data: Union[Dict[str, Any], PreparedDocument],
+                                       job_data: Union[Dict[str, Any], PreparedDocument, JobProfile]) -> float:
+        try:
+            resume_text = self.prepare(resume_data).text
+            job = self.prepare(job_data)
             
-            if not resume_text or not job_text:
+            if not resume_text or not job.text:
                 return 0.0
             
-            embeddings = self._get_semantic_embeddings([resume_text, job_text])
-            similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+            if isinstance(job, JobProfile) and job.vector is not None:
+                # The job side was vectorized once when the profile was built
+                embeddings = self._get_semantic_embeddings([resume_text])
+                job_vector = job.vector
+            else:
+                embeddings = self._get_semantic_embeddings([resume_text, job.text])
+                job_vector = embeddings[1] if embeddings is not None else None
+            if embeddings is None:
+                return 0.0
+            # CSR dot product of two L2-normalized rows is their cosine similarity
+            similarity = float(embeddings[0].multiply(job_vector).sum())
             
             return max(0.0, min(1.0, similarity))
         except Exception as e:
-            logger.error(f"Semantic similarity calculation failed: {str(e)}")
+            self._scoring_failed("Semantic similarity calculation", e)
             return 0.0
     
-    def _calculate_skill_match(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _calculate_skill_match(self, resume_data: Union[Dict[str, Any], PreparedDocument],
+                               job_data: Union[Dict[str, Any], PreparedDocument, JobProfile]) -> Dict[str, Any]:
         try:
-            resume_skills = self._extract_skills(resume_data)
-            job_skills = self._extract_skills(job_data)
+            resume_skills = self.prepare(resume_data).skills
+            job_skills = self.prepare(job_data).skills
             
             if not job_skills:
                 return {'score': 0.0, 'matched': [], 'missing': []}
             
-            matched_skills = []
-            for skill in job_skills:
-                if any(skill.lower() in resume_skill.lower() or resume_skill.lower() in skill.lower() 
-                      for resume_skill in resume_skills):
-                    matched_skills.append(skill)
-            
-            missing_skills = [skill for skill in job_skills if skill not in matched_skills]
+            matched_skills, missing_skills = self.skill_taxonomy.match(resume_skills, job_skills)
             
             score = len(matched_skills) / len(job_skills) if job_skills else 0.0
             
@@ -144,13 +689,14 @@ class SimilarityEngine:
                 'missing': missing_skills
             }
         except Exception as e:
-            logger.error(f"Skill match calculation failed: {str(e)}")
+            self._scoring_failed("Skill match calculation", e)
             return {'score': 0.0, 'matched': [], 'missing': []}
     
-    def _calculate_experience_match(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> float:
+    def _calculate_experience_match(self, resume_data: Union[Dict[str, Any], PreparedDocument],
+                                    job_data: Union[Dict[str, Any], PreparedDocument, JobProfile]) -> float:
         try:
-            resume_experience = self._extract_experience_years(resume_data)
-            job_experience = self._extract_experience_years(job_data)
+            resume_experience = self.prepare(resume_data).experience_years
+            job_experience = self.prepare(job_data).experience_years
             
             if job_experience == 0:
                 return 1.0
@@ -160,54 +706,43 @@ class SimilarityEngine:
             else:
                 return resume_experience / job_experience
         except Exception as e:
-            logger.error(f"Experience match calculation failed: {str(e)}")
+            self._scoring_failed("Experience match calculation", e)
             return 0.0
     
-    def _calculate_education_match(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> float:
+    def _calculate_education_match(self, resume_data: Union[Dict[str, Any], PreparedDocument],
+                                   job_data: Union[Dict[str, Any], PreparedDocument, JobProfile]) -> float:
         try:
-            resume_education = self._extract_education_level(resume_data)
-            job_education = self._extract_education_level(job_data)
-            
-            education_hierarchy = {
-                'phd': 6, 'doctorate': 6, 'doctoral': 6,
-                'masters': 5, 'master': 5, 'mba': 5, 'ms': 5, 'ma': 5,
-                'bachelors': 4, 'bachelor': 4, 'bs': 4, 'ba': 4, 'be': 4,
-                'associates': 3, 'associate': 3, 'diploma': 3,
-                'high school': 2, 'secondary': 2,
-                'none': 1
-            }
-            
-            resume_level = education_hierarchy.get(resume_education.lower(), 1)
-            job_level = education_hierarchy.get(job_education.lower(), 1)
+            resume_level = self._education_rank(self.prepare(resume_data).education_level)
+            job_level = self._education_rank(self.prepare(job_data).education_level)
             
             if resume_level >= job_level:
                 return 1.0
             else:
                 return resume_level / job_level
         except Exception as e:
-            logger.error(f"Education match calculation failed: {str(e)}")
+            self._scoring_failed("Education match calculation", e)
             return 0.0
     
-    def _calculate_keyword_match(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> float:
+    def _calculate_keyword_match(self, resume_data: Union[Dict[str, Any], PreparedDocument],
+                                 job_data: Union[Dict[str, Any], PreparedDocument, JobProfile]) -> float:
+        """Weighted share of job keywords that occur in the resume as whole words.
+        
+        Resume words are collected into a set once, so each keyword is a set lookup
+        rather than a substring search of the resume. Unlike the previous substring
+        search, "manage" is not found in "management", nor "python" in "python3".
+        """
         try:
-            resume_text = self._extract_text_from_data(resume_data).lower()
-            job_text = self._extract_text_from_data(job_data).lower()
-            
-            if not job_text:
+            keyword_weights = self._job_keyword_weights(self.prepare(job_data))
+            total_weight = sum(keyword_weights.values())
+            if not total_weight:
                 return 0.0
             
-            # Extract important keywords from job description
-            important_keywords = re.findall(r'\b[a-zA-Z]{3,}\b', job_text)
-            important_keywords = [word for word in important_keywords if len(word) > 3]
+            resume_terms = self.prepare(resume_data).terms
+            matched_weight = sum(weight for keyword, weight in keyword_weights.items() if keyword in resume_terms)
             
-            if not important_keywords:
-                return 0.0
-            
-            matched_keywords = sum(1 for keyword in important_keywords if keyword in resume_text)
-            
-            return matched_keywords / len(important_keywords)
+            return matched_weight / total_weight
         except Exception as e:
-            logger.error(f"Keyword match calculation failed: {str(e)}")
+            self._scoring_failed("Keyword match calculation", e)
             return 0.0
     
     def _extract_text_from_data(self, data: Dict[str, Any]) -> str:
@@ -232,71 +767,39 @@ class SimilarityEngine:
         except Exception:
             return ""
     
-    def _extract_skills(self, data: Dict[str, Any]) -> List[str]:
+    def _find_skills(self, document: PreparedDocument) -> List[str]:
+        """Sorted canonical skill ids; aliases count, but only as whole tokens, not substrings"""
         try:
-            skills = []
-            text = self._extract_text_from_data(data).lower()
-            
-            # Extract from predefined skill categories
-            for category, skill_list in self.skill_categories.items():
-                for skill in skill_list:
-                    if skill.lower() in text:
-                        skills.append(skill)
+            skills = self.skill_taxonomy.find_skills(document.lower_text)
             
             # Extract from structured data if available
+            data = document.data
             if 'keywords' in data and isinstance(data['keywords'], dict):
                 if 'technical_skills' in data['keywords']:
-                    skills.extend([skill['term'] for skill in data['keywords']['technical_skills']])
+                    skills.update(self.skill_taxonomy.canonicalize(skill['term'])
+                                  for skill in data['keywords']['technical_skills'])
             
-            return list(set(skills))
+            return sorted(skills)
         except Exception:
             return []
     
-    def _extract_experience_years(self, data: Dict[str, Any]) -> int:
-        try:
-            text = self._extract_text_from_data(data)
-            
-            # Look for patterns like "5 years", "3+ years", etc.
-            experience_patterns = [
-                r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
-                r'(\d+)\+?\s*years?\s*in',
-                r'experience\s*:\s*(\d+)\+?\s*years?',
-                r'(\d+)\+?\s*years?\s*working'
-            ]
-            
-            max_years = 0
-            for pattern in experience_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    try:
-                        years = int(match)
-                        max_years = max(max_years, years)
-                    except ValueError:
-                        continue
-            
-            return max_years
-        except Exception:
-            return 0
+    @staticmethod
+    def _find_experience_years(text: str) -> int:
+        max_years = 0
+        for pattern in EXPERIENCE_PATTERNS:
+            for match in pattern.findall(text):
+                try:
+                    max_years = max(max_years, int(match))
+                except ValueError:
+                    continue
+        return max_years
     
-    def _extract_education_level(self, data: Dict[str, Any]) -> str:
-        try:
-            text = self._extract_text_from_data(data).lower()
-            
-            education_keywords = {
-                'phd': ['phd', 'ph.d', 'doctorate', 'doctoral'],
-                'masters': ['masters', 'master', 'mba', 'm.s.', 'm.a.', 'ms ', 'ma '],
-                'bachelors': ['bachelors', 'bachelor', 'b.s.', 'b.a.', 'bs ', 'ba ', 'be ', 'b.e.'],
-                'associates': ['associates', 'associate', 'diploma'],
-                'high school': ['high school', 'secondary', '12th']
-            }
-            
-            for level, keywords in education_keywords.items():
-                if any(keyword in text for keyword in keywords):
-                    return level
-            
-            return 'none'
-        except Exception:
-            return 'none'
+    @staticmethod
+    def _find_education_level(lower_text: str) -> str:
+        for level, keywords in EDUCATION_KEYWORDS.items():
+            if any(keyword in lower_text for keyword in keywords):
+                return level
+        return 'none'
     
     def _generate_analysis(self, result: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import re
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Sequence, Set, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+SKILL_CATEGORIES = MappingProxyType({
+    'programming': ('python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'php', 'go', 'rust', 'swift', 'kotlin'),
+    'web_development': ('html', 'css', 'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'fastapi'),
+    'databases': ('sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'oracle', 'sqlite'),
+    'cloud': ('aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'gitlab'),
+    'data_science': ('pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'r', 'stata', 'spss'),
+    'tools': ('git', 'linux', 'bash', 'vim', 'vscode', 'intellij', 'eclipse', 'postman')
+})
+
+# Alternative spellings mapped to the canonical skill id they stand for
+SKILL_ALIASES = MappingProxyType({
+    'javascript': ('js', 'ecmascript'),
+    'typescript': ('ts',),
+    'c++': ('cpp',),
+    'c#': ('csharp', 'c sharp'),
+    'go': ('golang',),
+    'react': ('react.js', 'reactjs'),
+    'angular': ('angular.js', 'angularjs'),
+    'vue': ('vue.js', 'vuejs'),
+    'node.js': ('nodejs', 'node js'),
+    'express': ('express.js', 'expressjs'),
+    'postgresql': ('postgres',),
+    'mongodb': ('mongo',),
+    'aws': ('amazon web services',),
+    'gcp': ('google cloud', 'google cloud platform'),
+    'kubernetes': ('k8s',),
+    'scikit-learn': ('sklearn', 'scikit learn'),
+    'vscode': ('vs code', 'visual studio code')
+})
+
+# Letters, digits and the symbols that occur inside skill names (c++, c#, node.js)
+_TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+
+
+# Set bits per byte value; numpy 1.24 has no vectorized popcount
+_POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def tokenize_skill_text(text: str) -> List[str]:
+    """Lowercase tokens with sentence punctuation stripped; the same rule applies to aliases and documents"""
+    return [token.rstrip('.') for token in _TOKEN_PATTERN.findall(text.lower())]
+
+
+def popcount(packed: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a (rows, words) uint64 mask array"""
+    packed = np.ascontiguousarray(packed, dtype=np.uint64)
+    return _POPCOUNT_TABLE[packed.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+
+class SkillTaxonomy:
+    """Canonical skill ids with a precomputed alias index and containment relations.
+
+    Built once and read-only afterwards, so one instance can be shared by every request
+    and thread. Skills are found by looking up token n-grams in the alias index, and
+    two skills match when they are related, which is precomputed with the two-way
+    substring rule the engine used to evaluate per request ("sql" and "postgresql",
+    "java" and "javascript"). Ids shorter than MIN_CONTAINED_LENGTH only match
+    themselves, so "r" and "go" no longer match "redis" or "django".
+
+    Skill ids also have fixed bit positions, so a set of ids is an int mask and many
+    masks pack into a (rows, words) uint64 array for AND/popcount filtering. Terms
+    outside the taxonomy have no bit. fingerprint changes with the ids or aliases.
+    """
+
+    MIN_CONTAINED_LENGTH = 3
+
+    def __init__(self, categories: Mapping[str, Sequence[str]] = SKILL_CATEGORIES,
+                 aliases: Mapping[str, Sequence[str]] = SKILL_ALIASES):
+        self.categories = MappingProxyType({
+            category: tuple(skill.lower() for skill in skills) for category, skills in categories.items()
+        })
+        self.skill_ids: Tuple[str, ...] = tuple(dict.fromkeys(
+            skill for skills in self.categories.values() for skill in skills
+        ))
+
+        alias_index: Dict[Tuple[str, ...], str] = {}
+        for skill_id in self.skill_ids:
+            for alias in (skill_id, *aliases.get(skill_id, ())):
+                tokens = tuple(tokenize_skill_text(alias))
+                if tokens:
+                    alias_index.setdefault(tokens, skill_id)
+        self.alias_index = MappingProxyType(alias_index)
+        self.max_alias_tokens = max((len(tokens) for tokens in alias_index), default=1)
+
+        self.related: Mapping[str, FrozenSet[str]] = MappingProxyType({
+            skill_id: frozenset(
+                other for other in self.skill_ids
+                if other == skill_id or self._contains(skill_id, other) or self._contains(other, skill_id)
+            )
+            for skill_id in self.skill_ids
+        })
+
+        self.bit_index: Mapping[str, int] = MappingProxyType({
+            skill_id: bit for bit, skill_id in enumerate(self.skill_ids)
+        })
+        self.mask_words = max(1, (len(self.skill_ids) + 63) // 64)
+        self.related_masks: Tuple[int, ...] = tuple(
+            self.skill_mask(self.related[skill_id]) for skill_id in self.skill_ids
+        )
+        self._related_packed = self.pack_masks(self.related_masks)
+        self.fingerprint = hashlib.sha1('\n'.join([
+            *self.skill_ids,
+            *sorted(f"{' '.join(tokens)}={skill_id}" for tokens, skill_id in alias_index.items())
+        ]).encode('utf-8')).hexdigest()[:16]
+
+        logger.info(f"Skill taxonomy built with {len(self.skill_ids)} skills and {len(alias_index)} aliases")
+
+    @classmethod
+    def _contains(cls, skill_id: str, other: str) -> bool:
+        return len(other) >= cls.MIN_CONTAINED_LENGTH and other in skill_id
+
+    def find_skills(self, text: str) -> Set[str]:
+        """Canonical ids of every skill or alias that occurs in text as whole tokens"""
+        return self.find_skills_in_tokens(tokenize_skill_text(text))
+
+    def find_skills_in_tokens(self, tokens: Sequence[str]) -> Set[str]:
+        found = set()
+        alias_index = self.alias_index
+        for start in range(len(tokens)):
+            for length in range(1, min(self.max_alias_tokens, len(tokens) - start) + 1):
+                skill_id = alias_index.get(tuple(tokens[start:start + length]))
+                if skill_id is not None:
+                    found.add(skill_id)
+        return found
+
+    def canonicalize(self, term: str) -> str:
+        """Canonical id of a free-form skill term; unknown terms are kept as their lowercase form"""
+        return self.alias_index.get(tuple(tokenize_skill_text(term)), term.strip().lower())
+
+    def related_skills(self, skill_id: str) -> FrozenSet[str]:
+        return self.related.get(skill_id) or frozenset((skill_id,))
+
+    def skill_mask(self, skills: Iterable[str]) -> int:
+        """Bitmask of the taxonomy skills among skills; other terms are ignored"""
+        mask = 0
+        bit_index = self.bit_index
+        for skill_id in skills:
+            bit = bit_index.get(skill_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def skills_in_mask(self, mask: int) -> List[str]:
+        return [skill_id for bit, skill_id in enumerate(self.skill_ids) if mask >> bit & 1]
+
+    def covered_mask(self, mask: int) -> int:
+        """Every skill a resume with these skills satisfies, i.e. the union of their related skills"""
+        covered = 0
+        for bit, related_mask in enumerate(self.related_masks):
+            if mask >> bit & 1:
+                covered |= related_mask
+        return covered
+
+    def pack_masks(self, masks: Sequence[int]) -> np.ndarray:
+        packed = np.zeros((len(masks), self.mask_words), dtype=np.uint64)
+        for word in range(self.mask_words):
+            shift = 64 * word
+            packed[:, word] = [(mask >> shift) & 0xFFFFFFFFFFFFFFFF for mask in masks]
+        return packed
+
+    def mask_overlap(self, packed: np.ndarray, job_mask: int) -> Dict[str, np.ndarray]:
+        """Per-row matched and missing required skill counts plus Jaccard overlap with the job's skills"""
+        job_packed = self.pack_masks([job_mask])[0]
+        # A required skill is matched when the row has any skill related to it: one AND per required skill
+        matched = np.zeros(len(packed), dtype=np.int64)
+        for bit in range(len(self.skill_ids)):
+            if job_mask >> bit & 1:
+                matched += (packed & self._related_packed[bit]).any(axis=1)
+        union = popcount(packed | job_packed)
+        return {
+            'matched': matched,
+            'missing': popcount(job_packed[np.newaxis, :]) - matched,
+            'jaccard': np.divide(popcount(packed & job_packed), union,
+                                 out=np.zeros(len(packed)), where=union > 0)
+        }
+
+    def match(self, resume_skills: Iterable[str], job_skills: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Split job skills into (matched, missing) against the resume's skill ids"""
+        resume_skills = set(resume_skills)
+        covered = self.covered_mask(self.skill_mask(resume_skills))
+        bit_index = self.bit_index
+        matched, missing = [], []
+        for skill_id in job_skills:
+            bit = bit_index.get(skill_id)
+            # Terms outside the taxonomy are only related to themselves
+            is_matched = skill_id in resume_skills if bit is None else covered >> bit & 1
+            if is_matched:
+                matched.append(skill_id)
+            else:
+                missing.append(skill_id)
+        return matched, missing
+
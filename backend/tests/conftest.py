@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# The backend modules import each other by bare name, as they do when run from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the app's databases and result files out of the working tree
+_test_dir = tempfile.mkdtemp(prefix='resumatch-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_test_dir, 'resumatch.db')}")
+os.environ.setdefault('UPLOAD_DIR', os.path.join(_test_dir, 'uploads'))
+os.environ.setdefault('RESULTS_DIR', os.path.join(_test_dir, 'results'))
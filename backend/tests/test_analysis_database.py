@@ -0,0 +1,78 @@
+import sqlite3
+
+from analysis_database import AnalysisDatabase, SkillMaskIndex
+from skill_taxonomy import SkillTaxonomy
+
+TAXONOMY = SkillTaxonomy()
+
+
+def _analysis(analysis_id, resume_hash, skills, timestamp='2026-01-01T00:00:00'):
+    return {
+        'analysis_id': analysis_id,
+        'timestamp': timestamp,
+        'resume_file': f'{analysis_id}.pdf',
+        'similarity_analysis': {'overall_score': 0.5, 'component_scores': {}},
+        'resume_analysis': {'skill_mask': {
+            'taxonomy': TAXONOMY.fingerprint,
+            'mask': format(TAXONOMY.skill_mask(skills), 'x'),
+            'resume_hash': resume_hash
+        }}
+    }
+
+
+def _save(database, *analyses):
+    for analysis in analyses:
+        database.save(analysis)
+    database.flush()
+
+
+def test_index_keeps_one_entry_per_resume_and_reads_only_new_rows(tmp_path):
+    database = AnalysisDatabase(f"sqlite:///{tmp_path / 'analyses.db'}", flush_interval=0.01)
+    index = SkillMaskIndex(database, TAXONOMY)
+    try:
+        _save(database, _analysis('a1', 'resume-a', ['python']), _analysis('b1', 'resume-b', ['java']))
+        rows, masks, packed = index.snapshot(TAXONOMY.fingerprint)
+        assert [row['analysis_id'] for row in rows] == ['a1', 'b1']
+
+        _save(database, _analysis('a2', 'resume-a', ['python', 'docker']), _analysis('c1', 'resume-c', ['sql']))
+        read = []
+        original = database.skill_masks
+
+        def skill_masks(taxonomy, after_id=0):
+            read.extend(original(taxonomy, after_id))
+            return read
+
+        database.skill_masks = skill_masks
+        rows, masks, packed = index.snapshot(TAXONOMY.fingerprint)
+
+        assert [row.analysis_id for row in read] == ['a2', 'c1']
+        assert [row['analysis_id'] for row in rows] == ['a2', 'b1', 'c1']
+        assert masks[0] == TAXONOMY.skill_mask(['python', 'docker'])
+        assert (packed == TAXONOMY.pack_masks(masks)).all()
+    finally:
+        database.close()
+
+
+def test_masks_from_the_per_analysis_table_are_carried_over(tmp_path):
+    path = tmp_path / 'analyses.db'
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE resume_skills (analysis_id VARCHAR(36) PRIMARY KEY, created_at DATETIME '
+                           'NOT NULL, resume_file VARCHAR(255), taxonomy VARCHAR(16) NOT NULL, skill_mask VARCHAR(64) '
+                           'NOT NULL)')
+        connection.execute('INSERT INTO resume_skills VALUES (?, ?, ?, ?, ?)',
+                           ('old', '2025-01-01 00:00:00.000000', 'old.pdf', TAXONOMY.fingerprint,
+                            format(TAXONOMY.skill_mask(['python']), 'x')))
+
+    database = AnalysisDatabase(f"sqlite:///{path}", flush_interval=0.01)
+    try:
+        rows, masks, _ = SkillMaskIndex(database, TAXONOMY).snapshot(TAXONOMY.fingerprint)
+        assert [row['analysis_id'] for row in rows] == ['old']
+        assert masks == [TAXONOMY.skill_mask(['python'])]
+    finally:
+        database.close()
+
+    reopened = AnalysisDatabase(f"sqlite:///{path}")
+    try:
+        assert len(reopened.skill_masks(TAXONOMY.fingerprint)) == 1
+    finally:
+        reopened.close()
@@ -0,0 +1,24 @@
+import pytest
+
+from analysis_pipeline import AnalysisPipeline
+
+RESUME = b"Senior Python developer, 6 years building Django and PostgreSQL services on AWS with Docker."
+JOB_DESCRIPTION = "We need a Python developer with Django, PostgreSQL and Docker experience, 5+ years."
+
+
+@pytest.fixture
+def pipeline():
+    return AnalysisPipeline()
+
+
+@pytest.mark.parametrize('first_explain, second_explain', [(False, True), (True, False)])
+def test_score_cache_is_shared_by_explained_and_score_only_runs(pipeline, first_explain, second_explain):
+    first = pipeline.run('resume.txt', RESUME, JOB_DESCRIPTION, explain=first_explain)
+    second = pipeline.run('resume.txt', RESUME, JOB_DESCRIPTION, explain=second_explain)
+
+    assert first['extraction_info']['cache'] == 'miss'
+    assert second['extraction_info']['cache'] == 'score'
+    assert len(pipeline.score_cache) == 1
+    assert second['similarity_analysis']['overall_score'] == first['similarity_analysis']['overall_score']
+    assert ('recommendations' in second['similarity_analysis']) is second_explain
+    assert ('recommendations' in first['similarity_analysis']) is first_explain
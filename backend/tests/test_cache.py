@@ -0,0 +1,31 @@
+import os
+import time
+
+from cache import DiskCache
+
+
+def _files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def test_disk_cache_keeps_the_newest_max_entries(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=5)
+    for index in range(12):
+        cache.set(f'key{index:02d}', {'index': index})
+
+    assert _files(tmp_path) == [f'key{index:02d}.json' for index in range(7, 12)]
+    assert cache.get('key11') == {'index': 11}
+    assert cache.get('key00') is None
+
+
+def test_disk_cache_prunes_files_left_by_an_earlier_instance(tmp_path):
+    earlier = DiskCache(str(tmp_path), max_entries=100)
+    for index in range(6):
+        earlier.set(f'old{index}', index)
+        # Distinct modification times, so the scan at start orders them like the writes
+        os.utime(tmp_path / f'old{index}.json', (time.time() - 100 + index,) * 2)
+
+    cache = DiskCache(str(tmp_path), max_entries=4)
+    cache.set('new', 'value')
+
+    assert _files(tmp_path) == ['new.json', 'old3.json', 'old4.json', 'old5.json']
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from analysis_pipeline import PIPELINE_STAGES, ExtractionError
+from job_queue import JobQueue, JobWorkerPool
+
+
+def _wait_for(client: TestClient, job_id: str, condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if condition(job):
+            return job
+        time.sleep(0.05)
+    pytest.fail(f"job {job_id} never reached the expected state")
+
+
+def test_job_status_answers_while_a_job_is_extracting(monkeypatch):
+    release = threading.Event()
+    extracting = threading.Event()
+    released_by_test = []
+
+    def blocking_run(filename, file_content, job_description, progress=None, explain=True):
+        progress('extracting')
+        extracting.set()
+        # A pipeline running on the event loop would hold every request until this times out
+        released_by_test.append(release.wait(timeout=5))
+        raise ExtractionError("stopped by test")
+
+    monkeypatch.setattr(main.analysis_executor, 'mode', 'inline')
+    monkeypatch.setattr(main.analysis_executor._get_pipeline(), 'run', blocking_run)
+
+    with TestClient(main.app) as client:
+        response = client.post(
+            '/jobs',
+            files={'resume': ('resume.txt', b'Python developer with SQL experience')},
+            data={'job_description': 'Looking for a Python developer'}
+        )
+        assert response.status_code == 202
+        job_id = response.json()['job_id']
+
+        assert extracting.wait(timeout=10)
+        job = _wait_for(client, job_id, lambda job: job['stage'] == 'extracting')
+        assert job['status'] == 'running'
+        assert job['progress']['stages']['extracting']['status'] == 'running'
+        assert client.get('/health').status_code == 200
+        assert not release.is_set()
+
+        release.set()
+        job = _wait_for(client, job_id, lambda job: job['status'] == 'failed')
+        assert 'stopped by test' in job['error']
+        assert released_by_test == [True]
+
+
+def _run_pool(job_queue, handler, stale_after, scenario, workers=1):
+    async def run():
+        pool = JobWorkerPool(job_queue, handler, workers=workers, poll_interval=0.05, stale_after=stale_after)
+        pool.start()
+        try:
+            await scenario(pool)
+        finally:
+            await pool.stop()
+    asyncio.run(run())
+
+
+def _wait_for_status(job_queue, job_id, status, timeout=5.0):
+    async def wait():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = await asyncio.to_thread(job_queue.get, job_id)
+            if job['status'] == status:
+                return job
+            await asyncio.sleep(0.02)
+        pytest.fail(f"job {job_id} never reached {status}")
+    return wait()
+
+
+def test_jobs_left_running_by_a_dead_process_are_recovered_without_a_restart(tmp_path):
+    job_queue = JobQueue(f"sqlite:///{tmp_path / 'jobs.db'}", str(tmp_path / 'uploads'), PIPELINE_STAGES)
+    handled = []
+
+    async def handler(job, file_content, on_stage):
+        handled.append(job['job_id'])
+        return 'analysis-id'
+
+    async def scenario(pool):
+        # Claimed by a server process that was killed after the pool here had started
+        job_id = job_queue.submit('resume.txt', b'resume', 'job description')
+        assert job_queue.claim_next()['job_id'] == job_id
+        await _wait_for_status(job_queue, job_id, 'completed')
+        assert handled == [job_id]
+
+    _run_pool(job_queue, handler, 0.4, scenario)
+
+
+def test_a_running_job_is_not_requeued_while_it_sends_heartbeats(tmp_path):
+    job_queue = JobQueue(f"sqlite:///{tmp_path / 'jobs.db'}", str(tmp_path / 'uploads'), PIPELINE_STAGES)
+    handled = []
+
+    async def handler(job, file_content, on_stage):
+        handled.append(job['job_id'])
+        await asyncio.sleep(1.0)
+        return 'analysis-id'
+
+    async def scenario(pool):
+        job_id = job_queue.submit('resume.txt', b'resume', 'job description')
+        pool.notify()
+        await _wait_for_status(job_queue, job_id, 'completed')
+        assert handled == [job_id]
+
+    _run_pool(job_queue, handler, 0.4, scenario, workers=2)
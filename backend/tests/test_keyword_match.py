@@ -0,0 +1,44 @@
+"""Whole-token matching where the old substring search found partial words"""
+import pytest
+
+from similarity_engine import SimilarityEngine
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return SimilarityEngine(model_name='hashing', strict=True)
+
+
+@pytest.mark.parametrize('keyword, resume_text', [
+    ('manage', 'management experience'),
+    ('java', 'javascript developer'),
+    ('python', 'python3 and django'),
+])
+def test_keyword_inside_a_longer_word_is_not_matched(engine, keyword, resume_text):
+    # The substring search counted these as matches
+    assert keyword in resume_text
+    assert engine._calculate_keyword_match({'text': resume_text}, {'text': keyword}) == 0.0
+
+
+@pytest.mark.parametrize('keyword, resume_text', [
+    ('manage', 'able to manage teams'),
+    ('java', 'java and javascript developer'),
+    ('python', 'python and django'),
+])
+def test_keyword_as_a_whole_word_is_matched(engine, keyword, resume_text):
+    assert engine._calculate_keyword_match({'text': resume_text}, {'text': keyword}) == 1.0
+
+
+@pytest.mark.parametrize('skill, resume_text', [
+    ('r', 'azure cloud engineer'),
+    ('go', 'django web developer'),
+    ('java', 'javascript developer'),
+    ('python', 'python3 scripting'),
+])
+def test_skill_inside_a_longer_word_is_not_found(engine, skill, resume_text):
+    assert skill in resume_text
+    assert skill not in engine.skill_taxonomy.find_skills(resume_text)
+
+
+def test_short_skills_are_found_as_whole_words(engine):
+    assert {'r', 'go'} <= engine.skill_taxonomy.find_skills('statistics in r and services in go')
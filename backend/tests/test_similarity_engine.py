@@ -0,0 +1,30 @@
+from similarity_engine import JobProfile, SimilarityEngine, create_tfidf_vectorizer
+
+JOB = {'text': 'python developer building data pipelines', 'skills': {'technical_skills': ['python']}}
+
+
+def _corpus_engine(documents):
+    return SimilarityEngine(model_name='tfidf', tfidf_vectorizer=create_tfidf_vectorizer().fit(documents), strict=True)
+
+
+def test_refitted_corpus_model_with_the_same_vocabulary_size_changes_the_signature():
+    first = _corpus_engine(['python developer pipelines', 'python developer', 'data pipelines'])
+    refitted = _corpus_engine(['python developer pipelines', 'python developer', 'data pipelines',
+                               'data pipelines'])
+    assert len(first.tfidf_vectorizer.vocabulary_) == len(refitted.tfidf_vectorizer.vocabulary_)
+
+    assert first.signature != refitted.signature
+    assert first.signature == _corpus_engine(['python developer pipelines', 'python developer',
+                                              'data pipelines']).signature
+
+
+def test_job_profile_from_a_refitted_model_is_rebuilt():
+    first = _corpus_engine(['python developer pipelines', 'python developer', 'data pipelines'])
+    refitted = _corpus_engine(['python developer pipelines', 'python developer', 'data pipelines',
+                               'data pipelines'])
+    stale = JobProfile.from_dict(first.build_job_profile(JOB).to_dict())
+
+    prepared = refitted.prepare(stale)
+
+    assert prepared.engine_signature == refitted.signature
+    assert abs(prepared.vector - stale.vector).sum() > 0
@@ -0,0 +1,131 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pytesseract
+from PIL import Image, ImageDraw
+
+from text_extractor import TextExtractor
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return TextExtractor(ocr_binarize=True)
+
+
+@pytest.mark.parametrize('mode, clear, ink', [
+    ('RGBA', (0, 0, 0, 0), (0, 0, 0, 255)),
+    ('LA', (0, 0), (0, 255)),
+])
+def test_transparent_background_is_flattened_onto_white(extractor, mode, clear, ink):
+    image = Image.new(mode, (200, 80), clear)
+    ImageDraw.Draw(image).rectangle((20, 20, 120, 40), fill=ink)
+
+    prepared = extractor._prepare_ocr_image(image)
+
+    assert prepared.mode == 'L'
+    assert prepared.getpixel((5, 5)) == 255
+    assert prepared.getpixel((50, 30)) == 0
+
+
+def test_palette_transparency_is_flattened_onto_white(extractor):
+    image = Image.new('P', (200, 80), 0)
+    image.putpalette([0, 0, 0] * 256)
+    image.info['transparency'] = 0
+    ImageDraw.Draw(image).rectangle((20, 20, 120, 40), fill=1)
+
+    prepared = extractor._prepare_ocr_image(image)
+
+    assert prepared.getpixel((5, 5)) == 255
+    assert prepared.getpixel((50, 30)) == 0
+
+
+def _scanned_pdf(fitz, pages: int) -> bytes:
+    image = Image.new('L', (400, 200), 255)
+    ImageDraw.Draw(image).text((20, 80), 'Python developer', fill=0)
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    document = fitz.open()
+    for _ in range(pages):
+        page = document.new_page()
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    pdf_bytes = document.tobytes()
+    document.close()
+    return pdf_bytes
+
+
+def test_concurrent_pdf_ocr_never_calls_pymupdf_from_two_threads(monkeypatch):
+    fitz = pytest.importorskip('fitz')
+    pdfs = [_scanned_pdf(fitz, 3) for _ in range(4)]
+    active = []
+    overlaps = []
+    original_get_pixmap = fitz.Page.get_pixmap
+
+    def tracked_get_pixmap(page, *args, **kwargs):
+        active.append(threading.get_ident())
+        overlaps.append(len(active))
+        time.sleep(0.01)
+        try:
+            return original_get_pixmap(page, *args, **kwargs)
+        finally:
+            active.remove(threading.get_ident())
+
+    monkeypatch.setattr(fitz.Page, 'get_pixmap', tracked_get_pixmap)
+    monkeypatch.setattr(pytesseract, 'image_to_string', lambda image, config='': 'Python developer')
+
+    extractor = TextExtractor(ocr_workers=2)
+    try:
+        with ThreadPoolExecutor(max_workers=len(pdfs)) as executor:
+            texts = list(executor.map(lambda pdf: extractor._ocr_pdf('scan.pdf', pdf), pdfs))
+    finally:
+        extractor.close()
+
+    assert texts == ['\n'.join(['Python developer'] * 3)] * len(pdfs)
+    assert len(overlaps) == 3 * len(pdfs)
+    assert max(overlaps) == 1
+
+
+def _mixed_pdf(fitz, scanned_pages: int, text_pages: int) -> bytes:
+    document = fitz.open(stream=_scanned_pdf(fitz, scanned_pages), filetype='pdf')
+    for page_number in range(text_pages):
+        page = document.new_page()
+        page.insert_text((72, 72), f'Experience with Django and PostgreSQL, section {page_number}')
+    pdf_bytes = document.tobytes()
+    document.close()
+    return pdf_bytes
+
+
+def test_mixed_pdf_ocrs_only_the_pages_without_a_text_layer(monkeypatch):
+    fitz = pytest.importorskip('fitz')
+    ocr_calls = []
+    monkeypatch.setattr(pytesseract, 'image_to_string',
+                        lambda image, config='': ocr_calls.append(image) or 'Scanned Python developer cover')
+
+    extractor = TextExtractor(pdf_workers=1)
+    try:
+        result = extractor._extract_from_pdf('mixed.pdf', _mixed_pdf(fitz, 3, 4))
+    finally:
+        extractor.close()
+
+    assert result['extraction_method'] == 'PyPDF2'
+    assert result['metadata']['engine_order'][0] == 'PyPDF2'
+    assert result['metadata']['ocr_pages'] == [1, 2, 3]
+    assert len(ocr_calls) == 3
+    assert 'Scanned Python developer cover' in result['text']
+    assert 'section 3' in result['text']
+
+
+def test_scanned_pdf_still_goes_straight_to_ocr(monkeypatch):
+    fitz = pytest.importorskip('fitz')
+    monkeypatch.setattr(pytesseract, 'image_to_string', lambda image, config='': 'Scanned Python developer page')
+
+    extractor = TextExtractor(pdf_workers=1)
+    try:
+        result = extractor._extract_from_pdf('scan.pdf', _scanned_pdf(fitz, 5))
+    finally:
+        extractor.close()
+
+    assert result['metadata']['engine_order'][0] == 'OCR'
+    assert result['extraction_method'] == 'OCR'
@@ -0,0 +1,78 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from similarity_engine import SimilarityEngine, create_tfidf_vectorizer
+
+SKILL_PHRASES = [
+    'python', 'java', 'javascript', 'react', 'django', 'sql', 'postgresql', 'docker', 'kubernetes',
+    'aws', 'machine learning', 'tensorflow', 'git', 'linux', 'project management', 'communication'
+]
+FILLER = ['built', 'team', 'services', 'data', 'customers', 'delivered', 'platform', 'years', 'led',
+          'improved', 'reporting', 'systems', 'design', 'testing', 'performance', 'release']
+
+THREADS = 8
+ROUNDS = 5
+
+
+def _document(rng: random.Random, skills: int, words: int) -> str:
+    tokens = rng.sample(SKILL_PHRASES, skills) + [rng.choice(FILLER) for _ in range(words)]
+    rng.shuffle(tokens)
+    return ' '.join(tokens) + f' {rng.randint(1, 12)} years of experience'
+
+
+def _corpus(count: int, seed: int):
+    rng = random.Random(seed)
+    return [_document(rng, rng.randint(2, 8), 80) for _ in range(count)]
+
+
+def _engines():
+    return {
+        'tfidf': SimilarityEngine(model_name='tfidf', strict=True),
+        'corpus': SimilarityEngine(
+            model_name='tfidf', tfidf_vectorizer=create_tfidf_vectorizer().fit(_corpus(50, seed=11)), strict=True
+        ),
+        'hashing': SimilarityEngine(model_name='hashing', strict=True),
+    }
+
+
+@pytest.mark.parametrize('mode', ['tfidf', 'corpus', 'hashing'])
+def test_concurrent_scoring_matches_sequential(mode):
+    engine = _engines()[mode]
+    job = engine.build_job_profile({'text': _document(random.Random(5), 6, 60)})
+    resumes = [{'text': text} for text in _corpus(24, seed=7)]
+
+    def score(index):
+        return index, engine.calculate_similarity(engine.prepare(resumes[index]), job)
+
+    def rank(_):
+        return engine.rank(resumes, job, top_k=5), engine.cascade_rank(resumes, job, top_k=5)[0]
+
+    expected = dict(score(index) for index in range(len(resumes)))
+    expected_ranking = rank(None)
+
+    tasks = list(range(len(resumes))) * ROUNDS
+    random.Random(13).shuffle(tasks)
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(score, tasks))
+        rankings = list(executor.map(rank, range(THREADS * 2)))
+
+    assert any(result['matched_skills'] for result in expected.values())
+    assert all(result == expected[index] for index, result in results)
+    assert all(ranking == expected_ranking for ranking in rankings)
+
+
+def test_concurrent_taxonomy_lookups_match_sequential():
+    taxonomy = SimilarityEngine(model_name='hashing', strict=True).skill_taxonomy
+    texts = _corpus(24, seed=17)
+    job_skills = sorted(taxonomy.find_skills(_document(random.Random(19), 6, 20)))
+
+    def lookup(text):
+        skills = taxonomy.find_skills(text)
+        return skills, taxonomy.skill_mask(skills), taxonomy.match(skills, job_skills)
+
+    expected = [lookup(text) for text in texts]
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        for _ in range(ROUNDS):
+            assert list(executor.map(lookup, texts)) == expected
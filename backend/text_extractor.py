@@ -5,19 +5,64 @@ import pytesseract
 from PIL import Image
 import io
 import magic
+import numpy as np
 import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Union, Optional, Dict, Any, List, Tuple
 import logging
+import time
 from collections import Counter
 import email
 import phonenumbers
 from urllib.parse import urlparse
 
+from cache import LRUCache, content_hash
+from config import config
+from process_pool import LazyProcessPool
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# PyMuPDF is not thread-safe, even across separate documents, and analyses run on several
+# threads. Every call into it (open, load, rasterize, close) holds this lock; tesseract does not.
+_PYMUPDF_LOCK = threading.RLock()
+
+
+def extract_pdf_page_range(pdf_bytes: bytes, engine: str, start: int, stop: int) -> List[Optional[str]]:
+    """Text of pages [start, stop) with PyPDF2 or pdfplumber; runs in page pool workers, which open the PDF themselves"""
+    if engine == 'PyPDF2':
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        return [reader.pages[page_number].extract_text() for page_number in range(start, stop)]
+    with pdfplumber.open(io.BytesIO(pdf_bytes), pages=list(range(start + 1, stop + 1))) as pdf:
+        return [page.extract_text() for page in pdf.pages]
+
+
 class TextExtractor:
-    def __init__(self):
+    VERSION = "1.6"
+    # Pages the PDF probe inspects, spread over the document, and the least text per page a
+    # text engine must find to be trusted
+    PDF_PROBE_PAGES = 3
+    MIN_TEXT_CHARS_PER_PAGE = 20
+
+    def __init__(self, pdf_workers: Optional[int] = None, pdf_parallel_min_pages: Optional[int] = None,
+                 ocr_enabled: Optional[bool] = None, ocr_config: Optional[str] = None,
+                 ocr_workers: Optional[int] = None, ocr_dpi: Optional[int] = None,
+                 ocr_max_image_side: Optional[int] = None, ocr_binarize: Optional[bool] = None):
+        self.pdf_workers = config.PDF_WORKERS if pdf_workers is None else pdf_workers
+        self.pdf_parallel_min_pages = (config.PDF_PARALLEL_MIN_PAGES if pdf_parallel_min_pages is None
+                                       else pdf_parallel_min_pages)
+        self.ocr_enabled = config.OCR_ENABLED if ocr_enabled is None else ocr_enabled
+        self.ocr_config = config.OCR_CONFIG if ocr_config is None else ocr_config
+        self.ocr_workers = max(1, config.OCR_WORKERS if ocr_workers is None else ocr_workers)
+        self.ocr_dpi = config.OCR_DPI if ocr_dpi is None else ocr_dpi
+        self.ocr_max_image_side = config.OCR_MAX_IMAGE_SIDE if ocr_max_image_side is None else ocr_max_image_side
+        self.ocr_binarize = config.OCR_BINARIZE if ocr_binarize is None else ocr_binarize
+        self._page_pool = LazyProcessPool('PDF page', self.pdf_workers)
+        self._pool_lock = threading.Lock()
+        self._ocr_pool = None
+        self.ocr_cache = LRUCache(max_entries=config.OCR_CACHE_SIZE)
         self.supported_formats = {
             'pdf': ['.pdf'],
             'docx': ['.docx', '.doc'],
@@ -100,6 +145,18 @@ class TextExtractor:
             }
         }
     
+    @property
+    def signature(self) -> str:
+        """Identifies the version and every setting that changes extracted text, for cache keys"""
+        return '/'.join([
+            self.VERSION,
+            'ocr' if self.ocr_enabled else 'no-ocr',
+            f"dpi{self.ocr_dpi}",
+            f"max{self.ocr_max_image_side}",
+            'binarize' if self.ocr_binarize else 'gray',
+            self.ocr_config
+        ])
+    
     def extract_text(self, file_path: str, file_content: bytes = None) -> Dict[str, Any]:
         try:
             file_type = self._detect_file_type(file_path, file_content)
@@ -202,96 +259,320 @@ class TextExtractor:
             logger.warning(f"File type detection failed: {str(e)}")
             return 'unknown'
     
+    def _probe_pdf(self, pdf_bytes: bytes) -> Dict[str, Any]:
+        """Page count and whether sampled pages draw text with fonts or only show images, without extracting text.
+        
+        The sample always includes the first and last pages, with the rest evenly spaced
+        between them, so a scanned cover alone does not make a PDF look scanned.
+        """
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        page_count = len(reader.pages)
+        sampled = min(page_count, self.PDF_PROBE_PAGES)
+        page_numbers = sorted({
+            round(index * (page_count - 1) / (sampled - 1)) if sampled > 1 else 0
+            for index in range(sampled)
+        })
+        font_pages = 0
+        image_pages = 0
+        for page_number in page_numbers:
+            has_fonts, has_images = self._page_resource_kinds(reader.pages[page_number].get('/Resources'))
+            font_pages += has_fonts
+            image_pages += has_images
+        
+        return {
+            'reader': reader,
+            'pages': page_count,
+            'sampled_pages': len(page_numbers),
+            'font_pages': font_pages,
+            'image_pages': image_pages
+        }
+    
+    @staticmethod
+    def _page_resource_kinds(resources, depth: int = 0) -> Tuple[bool, bool]:
+        """(has fonts, has images) for a resource dictionary, looking one level into form XObjects"""
+        if resources is None:
+            return False, False
+        resources = resources.get_object()
+        has_fonts = bool(resources.get('/Font'))
+        has_images = False
+        xobjects = resources.get('/XObject')
+        for xobject in (xobjects.get_object().values() if xobjects else []):
+            xobject = xobject.get_object()
+            subtype = xobject.get('/Subtype')
+            if subtype == '/Image':
+                has_images = True
+            elif subtype == '/Form' and depth == 0:
+                form_fonts, form_images = TextExtractor._page_resource_kinds(xobject.get('/Resources'), depth + 1)
+                has_fonts = has_fonts or form_fonts
+                has_images = has_images or form_images
+        return has_fonts, has_images
+    
+    def _pdf_engine_order(self, probe: Optional[Dict[str, Any]]) -> List[str]:
+        if not self.ocr_enabled:
+            return [engine for engine in self._pdf_engine_order_with_ocr(probe) if engine != 'OCR']
+        return self._pdf_engine_order_with_ocr(probe)
+    
+    @staticmethod
+    def _pdf_engine_order_with_ocr(probe: Optional[Dict[str, Any]]) -> List[str]:
+        if probe is None:
+            return ['pdfplumber', 'OCR']
+        if probe['font_pages']:
+            return ['PyPDF2', 'pdfplumber', 'OCR']
+        if probe['image_pages']:
+            # Scanned: no text layer to parse, unless unsampled later pages have one
+            return ['OCR'] if probe['sampled_pages'] == probe['pages'] else ['OCR', 'PyPDF2']
+        return ['PyPDF2', 'pdfplumber', 'OCR']
+    
     def _extract_from_pdf(self, file_path: str, file_content: bytes = None) -> Dict[str, Any]:
+        """Extract text with the cheapest engine the PDF allows.
+        
+        A PyPDF2 probe of pages across the document checks for fonts (a text layer)
+        and images. Scanned PDFs go straight to OCR. PDFs with text go to PyPDF2, and
+        then to pdfplumber if PyPDF2 finds too little text. In a PDF that mixes both,
+        only the image pages without a text layer are OCRed, listed in
+        metadata['ocr_pages']. The metadata records the engines tried and their timings.
+        """
         methods_tried = []
+        timings = {}
         
-        try:
-            if file_content:
-                pdf_file = io.BytesIO(file_content)
-            else:
-                pdf_file = file_path
-                
-            with pdfplumber.open(pdf_file) as pdf:
-                text_parts = []
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                
-                if text_parts:
-                    methods_tried.append('pdfplumber')
-                    return {
-                        'text': '\n'.join(text_parts),
-                        'file_type': 'pdf',
-                        'extraction_method': 'pdfplumber',
-                        'success': True,
-                        'metadata': {
-                            'pages': len(pdf.pages),
-                            'methods_tried': methods_tried
-                        }
-                    }
-        except Exception as e:
-            methods_tried.append(f'pdfplumber_failed: {str(e)}')
-            logger.warning(f"pdfplumber extraction failed: {str(e)}")
+        if file_content:
+            pdf_bytes = file_content
+        else:
+            with open(file_path, 'rb') as pdf_file:
+                pdf_bytes = pdf_file.read()
         
+        started = time.perf_counter()
         try:
-            if file_content:
-                pdf_file = io.BytesIO(file_content)
-            else:
-                pdf_file = open(file_path, 'rb')
-                
-            reader = PyPDF2.PdfReader(pdf_file)
-            text_parts = []
+            probe = self._probe_pdf(pdf_bytes)
+        except Exception as e:
+            probe = None
+            methods_tried.append(f'probe_failed: {str(e)}')
+            logger.warning(f"PDF probe failed: {str(e)}")
+        timings['probe'] = round((time.perf_counter() - started) * 1000, 3)
+        
+        engines = self._pdf_engine_order(probe)
+        metadata = {
+            'methods_tried': methods_tried,
+            'engine_order': engines,
+            'engine_timings_ms': timings
+        }
+        if probe is not None:
+            metadata['pages'] = probe['pages']
+            metadata['probe'] = {key: value for key, value in probe.items() if key != 'reader'}
+        
+        # Too little PyPDF2 text is kept only in case no later engine does better
+        fallback = None
+        for engine in engines:
+            started = time.perf_counter()
+            try:
+                if engine in ('PyPDF2', 'pdfplumber'):
+                    page_texts = self._extract_pdf_pages(engine, pdf_bytes, probe, metadata)
+                    page_texts = self._ocr_pages_without_text(file_path, pdf_bytes, probe, page_texts, metadata)
+                    text = '\n'.join(filter(None, page_texts))
+                else:
+                    text = self._ocr_pdf(file_path, pdf_bytes, metadata)
+            except Exception as e:
+                text = ''
+                methods_tried.append(f'{engine}_failed: {str(e)}')
+                logger.warning(f"{engine} extraction failed: {str(e)}")
+            finally:
+                timings[engine] = round((time.perf_counter() - started) * 1000, 3)
             
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+            if not text.strip():
+                continue
+            if engine == 'PyPDF2' and len(text.strip()) < self.MIN_TEXT_CHARS_PER_PAGE * probe['pages']:
+                methods_tried.append('PyPDF2_sparse')
+                fallback = fallback or text
+                continue
             
-            if not file_content:
-                pdf_file.close()
-                
-            if text_parts:
-                methods_tried.append('PyPDF2')
-                return {
-                    'text': '\n'.join(text_parts),
-                    'file_type': 'pdf',
-                    'extraction_method': 'PyPDF2',
-                    'success': True,
-                    'metadata': {
-                        'pages': len(reader.pages),
-                        'methods_tried': methods_tried
-                    }
-                }
-                
-        except Exception as e:
-            methods_tried.append(f'PyPDF2_failed: {str(e)}')
-            logger.warning(f"PyPDF2 extraction failed: {str(e)}")
+            methods_tried.append(engine)
+            return self._pdf_result(text, engine, metadata)
         
-        try:
-            text = self._ocr_pdf(file_path, file_content)
-            if text.strip():
-                methods_tried.append('OCR')
-                return {
-                    'text': text,
-                    'file_type': 'pdf',
-                    'extraction_method': 'OCR',
-                    'success': True,
-                    'metadata': {
-                        'methods_tried': methods_tried,
-                        'note': 'Extracted using OCR - may contain errors'
-                    }
-                }
-        except Exception as e:
-            methods_tried.append(f'OCR_failed: {str(e)}')
-            logger.warning(f"OCR extraction failed: {str(e)}")
+        if fallback is not None:
+            methods_tried.append('PyPDF2')
+            return self._pdf_result(fallback, 'PyPDF2', metadata)
+        if not self.ocr_enabled:
+            metadata['note'] = 'OCR is disabled'
         
         return {
             'text': '',
             'file_type': 'pdf',
             'extraction_method': 'failed',
             'success': False,
-            'metadata': {'methods_tried': methods_tried}
+            'metadata': metadata
+        }
+    
+    def _extract_pdf_pages(self, engine: str, pdf_bytes: bytes, probe: Optional[Dict[str, Any]],
+                           metadata: Dict[str, Any]) -> List[Optional[str]]:
+        """Per-page text in page order; PDFs with at least pdf_parallel_min_pages pages are split across the page pool"""
+        page_count = probe['pages'] if probe is not None else 0
+        if self.pdf_workers > 1 and page_count >= max(2, self.pdf_parallel_min_pages):
+            try:
+                page_texts = self._extract_pdf_pages_parallel(engine, pdf_bytes, page_count)
+                metadata['parallel_workers'] = self.pdf_workers
+                return page_texts
+            except BrokenProcessPool as e:
+                logger.warning(f"PDF page pool failed, extracting serially: {str(e)}")
+                self._page_pool.discard()
+        
+        if engine == 'PyPDF2':
+            return [page.extract_text() for page in probe['reader'].pages]
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            metadata.setdefault('pages', len(pdf.pages))
+            return [page.extract_text() for page in pdf.pages]
+    
+    def _ocr_pages_without_text(self, file_path: str, pdf_bytes: bytes, probe: Optional[Dict[str, Any]],
+                                page_texts: List[Optional[str]], metadata: Dict[str, Any]) -> List[Optional[str]]:
+        """OCR the image pages a text engine found no text on, when other pages do have text"""
+        if not self.ocr_enabled or probe is None or len(page_texts) != probe['pages']:
+            return page_texts
+        blank_pages = [
+            page_number for page_number, page_text in enumerate(page_texts)
+            if len((page_text or '').strip()) < self.MIN_TEXT_CHARS_PER_PAGE
+        ]
+        # Nothing found anywhere is left to full OCR, which the engine order already has
+        if not blank_pages or len(blank_pages) == len(page_texts):
+            return page_texts
+        image_pages = [
+            page_number for page_number in blank_pages
+            if self._page_resource_kinds(probe['reader'].pages[page_number].get('/Resources'))[1]
+        ]
+        if not image_pages:
+            return page_texts
+        
+        started = time.perf_counter()
+        try:
+            ocr_texts = self._ocr_pdf_pages(file_path, pdf_bytes, image_pages, metadata)
+        except Exception as e:
+            metadata['methods_tried'].append(f'OCR_pages_failed: {str(e)}')
+            logger.warning(f"OCR of pages without text failed: {str(e)}")
+            return page_texts
+        finally:
+            metadata['engine_timings_ms']['OCR_pages'] = round((time.perf_counter() - started) * 1000, 3)
+        
+        page_texts = list(page_texts)
+        for page_number, ocr_text in zip(image_pages, ocr_texts):
+            if len(ocr_text.strip()) > len((page_texts[page_number] or '').strip()):
+                page_texts[page_number] = ocr_text
+        metadata['ocr_pages'] = [page_number + 1 for page_number in image_pages]
+        return page_texts
+    
+    def _extract_pdf_pages_parallel(self, engine: str, pdf_bytes: bytes, page_count: int) -> List[Optional[str]]:
+        # Two contiguous page ranges per worker evens out pages of different weight
+        chunk_count = min(page_count, self.pdf_workers * 2)
+        bounds = [page_count * chunk // chunk_count for chunk in range(chunk_count + 1)]
+        pool = self._get_page_pool()
+        futures = [
+            pool.submit(extract_pdf_page_range, pdf_bytes, engine, start, stop)
+            for start, stop in zip(bounds, bounds[1:])
+        ]
+        return [page_text for future in futures for page_text in future.result()]
+    
+    def _get_page_pool(self) -> ProcessPoolExecutor:
+        return self._page_pool.get()
+    
+    def _get_ocr_pool(self) -> ThreadPoolExecutor:
+        # tesseract runs as a subprocess, so threads suffice; the pool caps concurrent OCR across all requests
+        with self._pool_lock:
+            if self._ocr_pool is None:
+                self._ocr_pool = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix='ocr')
+            return self._ocr_pool
+    
+    def _ocr_image(self, image: Image.Image) -> str:
+        return pytesseract.image_to_string(image, config=self.ocr_config)
+    
+    def _ocr_cache_key(self, image: Image.Image) -> str:
+        """Hash of the prepared pixels and the tesseract options, so a page is recognised however it arrives"""
+        return content_hash(self.ocr_config, f'{image.mode}:{image.width}x{image.height}', image.tobytes())
+    
+    def _submit_ocr(self, image: Image.Image) -> Tuple[Union[str, Future], Optional[str]]:
+        """(cached text, None) for a page seen before, else (future, cache key) with tesseract started"""
+        cache_key = self._ocr_cache_key(image)
+        cached = self.ocr_cache.get(cache_key)
+        if cached is not None:
+            return cached, None
+        return self._get_ocr_pool().submit(self._ocr_image, image), cache_key
+    
+    def _collect_ocr(self, submitted: Tuple[Union[str, Future], Optional[str]]) -> str:
+        result, cache_key = submitted
+        if cache_key is None:
+            return result
+        text = result.result()
+        self.ocr_cache.set(cache_key, text)
+        return text
+    
+    @staticmethod
+    def _ocr_cache_stats(pages: int, hits: int) -> Dict[str, Any]:
+        return {'pages': pages, 'hits': hits, 'hit_rate': round(hits / pages, 4) if pages else 0.0}
+    
+    def _ocr_dpi_for_page(self, page) -> int:
+        """ocr_dpi, lowered for large pages so the longer side stays within ocr_max_image_side pixels"""
+        longest_side_inches = max(page.rect.width, page.rect.height) / 72
+        if longest_side_inches <= 0 or not self.ocr_max_image_side:
+            return self.ocr_dpi
+        return max(1, min(self.ocr_dpi, int(self.ocr_max_image_side / longest_side_inches)))
+    
+    def _render_page_for_ocr(self, page) -> Image.Image:
+        return self._prepare_ocr_image(self._rasterize_page(page))
+    
+    def _rasterize_page(self, page) -> Image.Image:
+        """Rasterize a PyMuPDF page straight to grayscale and copy out its pixels, with no PNG round trip"""
+        import fitz
+        
+        with _PYMUPDF_LOCK:
+            pix = page.get_pixmap(dpi=self._ocr_dpi_for_page(page), colorspace=fitz.csGRAY, alpha=False)
+            return Image.frombytes('L', (pix.width, pix.height), pix.samples)
+    
+    def _prepare_ocr_image(self, image: Image.Image) -> Image.Image:
+        """Grayscale, downscaled to ocr_max_image_side and, with ocr_binarize, black and white at Otsu's threshold"""
+        if 'A' in image.getbands() or 'transparency' in image.info:
+            # Transparent areas would turn black; flatten onto white as tesseract would have
+            rgba = image.convert('RGBA')
+            image = Image.new('L', rgba.size, 255)
+            image.paste(rgba.convert('L'), mask=rgba.getchannel('A'))
+        elif image.mode != 'L':
+            image = image.convert('L')
+        if self.ocr_max_image_side and max(image.size) > self.ocr_max_image_side:
+            scale = self.ocr_max_image_side / max(image.size)
+            image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                                 Image.LANCZOS)
+        if self.ocr_binarize:
+            threshold = self._otsu_threshold(image.histogram())
+            image = image.point([0] * (threshold + 1) + [255] * (255 - threshold))
+        return image
+    
+    @staticmethod
+    def _otsu_threshold(histogram: List[int]) -> int:
+        """Gray level that best separates text from background (maximum between-class variance)"""
+        counts = np.asarray(histogram[:256], dtype=np.float64)
+        levels = np.arange(256)
+        background_weight = np.cumsum(counts)
+        foreground_weight = background_weight[-1] - background_weight
+        cumulative_mean = np.cumsum(counts * levels)
+        background_mean = cumulative_mean / np.maximum(background_weight, 1)
+        foreground_mean = (cumulative_mean[-1] - cumulative_mean) / np.maximum(foreground_weight, 1)
+        between_variance = background_weight * foreground_weight * (background_mean - foreground_mean) ** 2
+        return int(np.argmax(between_variance))
+    
+    def close(self):
+        """Stop the PDF page pool and OCR threads, if they were started"""
+        self._page_pool.shutdown()
+        with self._pool_lock:
+            if self._ocr_pool is not None:
+                self._ocr_pool.shutdown(wait=False, cancel_futures=True)
+                self._ocr_pool = None
+    
+    @staticmethod
+    def _pdf_result(text: str, engine: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        metadata['engine'] = engine
+        if engine == 'OCR':
+            metadata['note'] = 'Extracted using OCR - may contain errors'
+        return {
+            'text': text,
+            'file_type': 'pdf',
+            'extraction_method': engine,
+            'success': True,
+            'metadata': metadata
         }
     
     def _extract_from_docx(self, file_path: str, file_content: bytes = None) -> Dict[str, Any]:
@@ -340,14 +621,25 @@ class TextExtractor:
             }
     
     def _extract_from_image(self, file_path: str, file_content: bytes = None) -> Dict[str, Any]:
+        if not self.ocr_enabled:
+            return {
+                'text': '',
+                'file_type': 'image',
+                'extraction_method': 'failed',
+                'success': False,
+                'error': 'OCR is disabled',
+                'metadata': {}
+            }
+        
         try:
             if file_content:
                 image = Image.open(io.BytesIO(file_content))
             else:
                 image = Image.open(file_path)
             
-            custom_config = r'--oem 3 --psm 6'
-            text = pytesseract.image_to_string(image, config=custom_config)
+            ocr_image = self._prepare_ocr_image(image)
+            submitted = self._submit_ocr(ocr_image)
+            text = self._collect_ocr(submitted)
             
             return {
                 'text': text,
@@ -356,7 +648,9 @@ class TextExtractor:
                 'success': True,
                 'metadata': {
                     'image_size': image.size,
-                    'image_mode': image.mode
+                    'image_mode': image.mode,
+                    'ocr_image_size': ocr_image.size,
+                    'ocr_cache': self._ocr_cache_stats(1, int(submitted[1] is None))
                 }
             }
             
@@ -423,28 +717,15 @@ class TextExtractor:
                 'metadata': {}
             }
     
-    def _ocr_pdf(self, file_path: str, file_content: bytes = None) -> str:
+    def _ocr_pdf(self, file_path: str, file_content: bytes = None,
+                 metadata: Optional[Dict[str, Any]] = None) -> str:
+        """OCR every page of a PDF; see _ocr_pdf_pages"""
+        if not self.ocr_enabled:
+            return ""
+        
         try:
-            import fitz  # PyMuPDF for PDF to image conversion
-            
-            if file_content:
-                doc = fitz.open(stream=file_content, filetype="pdf")
-            else:
-                doc = fitz.open(file_path)
-            
-            text_parts = []
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                pix = page.get_pixmap()
-                img_data = pix.tobytes("png")
-                img = Image.open(io.BytesIO(img_data))
-                
-                page_text = pytesseract.image_to_string(img)
-                if page_text.strip():
-                    text_parts.append(page_text)
-            
-            doc.close()
-            return '\n'.join(text_parts)
+            page_texts = self._ocr_pdf_pages(file_path, file_content, None, metadata)
+            return '\n'.join(page_text for page_text in page_texts if page_text.strip())
             
         except ImportError:
             logger.warning("PyMuPDF not available for PDF OCR")
@@ -453,6 +734,55 @@ class TextExtractor:
             logger.error(f"PDF OCR failed: {str(e)}")
             return ""
     
+    def _ocr_pdf_pages(self, file_path: str, file_content: Optional[bytes], page_numbers: Optional[List[int]],
+                       metadata: Optional[Dict[str, Any]] = None) -> List[str]:
+        """OCR text of the given pages (all when None), rasterizing the next pages while earlier ones are in tesseract.
+        
+        Rasterization stays on this thread, under the process-wide PyMuPDF lock, and
+        at most twice ocr_workers rendered pages wait at once, which bounds memory.
+        Pages whose rendered pixels were OCRed before come from the page cache; the
+        hit counts go into metadata['ocr_cache'].
+        """
+        import fitz  # PyMuPDF for PDF to image conversion
+        
+        with _PYMUPDF_LOCK:
+            if file_content:
+                doc = fitz.open(stream=file_content, filetype="pdf")
+            else:
+                doc = fitz.open(file_path)
+            if page_numbers is None:
+                page_numbers = range(len(doc))
+        
+        slots = threading.BoundedSemaphore(self.ocr_workers * 2)
+        pending = []
+        try:
+            for page_num in page_numbers:
+                slots.acquire()
+                try:
+                    with _PYMUPDF_LOCK:
+                        raw_image = self._rasterize_page(doc.load_page(page_num))
+                    img = self._prepare_ocr_image(raw_image)
+                    submitted = self._submit_ocr(img)
+                except Exception:
+                    slots.release()
+                    raise
+                if isinstance(submitted[0], Future):
+                    submitted[0].add_done_callback(lambda _: slots.release())
+                else:
+                    slots.release()
+                pending.append(submitted)
+            
+            # Results are collected in page order, whatever order tesseract finishes in
+            text_parts = [self._collect_ocr(submitted) for submitted in pending]
+        finally:
+            with _PYMUPDF_LOCK:
+                doc.close()
+        
+        if metadata is not None:
+            hits = sum(1 for _, cache_key in pending if cache_key is None)
+            metadata['ocr_cache'] = self._ocr_cache_stats(len(pending), hits)
+        return text_parts
+    
     def _clean_text(self, text: str) -> str:
         if not text:
             return ""
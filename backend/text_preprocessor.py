@@ -26,6 +26,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TextPreprocessor:
+    VERSION = "1.0"
     
     def __init__(self, language='en'):
         self.language = language